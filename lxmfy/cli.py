@@ -21,6 +21,81 @@ from .colors import (
 )
 from .templates import CogTestBot, EchoBot, NoteBot, ReminderBot
 
+TEMPLATES = {
+    "echo": EchoBot,
+    "reminder": ReminderBot,
+    "note": NoteBot,
+    "cogtest": CogTestBot,
+}
+
+# File names keep only ASCII letters, digits, "-" and "_"; non-ASCII is dropped
+# by encoding before this deletion table is applied
+_FILENAME_DELETE_TABLE = str.maketrans(
+    "",
+    "",
+    "".join(chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c) in "-_")),
+)
+# Bot names keep \w (the same Unicode alphanumerics as str.isalnum, plus "_"),
+# spaces and "-"
+_BOT_NAME_UNSAFE_RE = re.compile(r"[^\w \-]")
+
+# Source templates for generated files, filled in with str.format
+_BASIC_BOT_TEMPLATE = """from lxmfy import LXMFBot
+
+bot = LXMFBot(
+    name="{name}",
+    announce=600,
+    announce_immediately=True,
+    admins=set(),
+    hot_reloading=False,
+    rate_limit=5,
+    cooldown=60,
+    max_warnings=3,
+    warning_timeout=300,
+    command_prefix="/",
+    cogs_dir="cogs",
+    cogs_enabled={cogs_enabled},
+    permissions_enabled=False,
+    storage_type="json",
+    storage_path="data",
+    first_message_enabled=True,
+    event_logging_enabled=True,
+    max_logged_events=1000,
+    event_middleware_enabled=True,
+    announce_enabled=True
+)
+
+if __name__ == "__main__":
+    bot.run()
+"""
+
+_TEMPLATE_BOT_TEMPLATE = """from lxmfy.templates import {class_name}
+
+if __name__ == "__main__":
+    bot = {class_name}()
+    bot.bot.name = "{name}"  # Set custom name
+    bot.run()
+"""
+
+# Written verbatim, not formatted
+_EXAMPLE_COG_TEMPLATE = """from lxmfy import Command
+
+class BasicCommands:
+    def __init__(self, bot):
+        self.bot = bot
+
+    @Command(name="hello", description="Says hello")
+    async def hello(self, ctx):
+        ctx.reply(f"Hello {ctx.sender}!")
+
+    @Command(name="about", description="About this bot")
+    async def about(self, ctx):
+        ctx.reply("I'm a bot created with LXMFy!")
+
+def setup(bot):
+    bot.add_cog(BasicCommands(bot))
+"""
+
 
 def get_user_choice() -> str:
     """Get user's choice from the menu."""
@@ -136,14 +211,7 @@ def interactive_run() -> None:
             custom_name = None
 
     try:
-        template_map = {
-            "echo": EchoBot,
-            "reminder": ReminderBot,
-            "note": NoteBot,
-            "cogtest": CogTestBot,
-        }
-
-        BotClass = template_map[template]
+        BotClass = TEMPLATES[template]
         print_header(f"Starting {template} Bot")
         bot_instance = BotClass()
 
@@ -192,7 +260,8 @@ def sanitize_filename(filename: str) -> str:
 
     """
     base, ext = os.path.splitext(os.path.basename(filename))
-    base = re.sub(r"[^a-zA-Z0-9\-_]", "", base)
+    base = base.encode("ascii", "ignore").decode("ascii")
+    base = base.translate(_FILENAME_DELETE_TABLE)
 
     if not ext or ext != ".py":
         ext = ".py"
@@ -216,7 +285,7 @@ def validate_bot_name(name: str) -> str:
     if not name:
         raise ValueError("Bot name cannot be empty")
 
-    sanitized = "".join(c for c in name if c.isalnum() or c in " -_")
+    sanitized = _BOT_NAME_UNSAFE_RE.sub("", name)
     if not sanitized:
         raise ValueError("Bot name must contain valid characters")
 
@@ -253,34 +322,7 @@ def create_bot_file(name: str, output_path: str, no_cogs: bool = False) -> str:
 
         safe_path = os.path.abspath(output_path)
 
-        template = f"""from lxmfy import LXMFBot
-
-bot = LXMFBot(
-    name="{name}",
-    announce=600,
-    announce_immediately=True,
-    admins=set(),
-    hot_reloading=False,
-    rate_limit=5,
-    cooldown=60,
-    max_warnings=3,
-    warning_timeout=300,
-    command_prefix="/",
-    cogs_dir="cogs",
-    cogs_enabled={not no_cogs},
-    permissions_enabled=False,
-    storage_type="json",
-    storage_path="data",
-    first_message_enabled=True,
-    event_logging_enabled=True,
-    max_logged_events=1000,
-    event_middleware_enabled=True,
-    announce_enabled=True
-)
-
-if __name__ == "__main__":
-    bot.run()
-"""
+        template = _BASIC_BOT_TEMPLATE.format(name=name, cogs_enabled=not no_cogs)
         with open(safe_path, "w", encoding="utf-8") as f:
             f.write(template)
 
@@ -306,26 +348,9 @@ def create_example_cog(bot_path: str) -> None:
         with open(init_path, "w", encoding="utf-8") as f:
             f.write("")
 
-        template = """from lxmfy import Command
-
-class BasicCommands:
-    def __init__(self, bot):
-        self.bot = bot
-
-    @Command(name="hello", description="Says hello")
-    async def hello(self, ctx):
-        ctx.reply(f"Hello {ctx.sender}!")
-
-    @Command(name="about", description="About this bot")
-    async def about(self, ctx):
-        ctx.reply("I'm a bot created with LXMFy!")
-
-def setup(bot):
-    bot.add_cog(BasicCommands(bot))
-"""
         basic_path = os.path.join(cogs_dir, "basic.py")
         with open(basic_path, "w", encoding="utf-8") as f:
-            f.write(template)
+            f.write(_EXAMPLE_COG_TEMPLATE)
 
     except Exception as e:
         raise RuntimeError(f"Failed to create example cog: {e!s}") from e
@@ -363,25 +388,15 @@ def create_from_template(template_name: str, output_path: str, bot_name: str) ->
         if template_name == "basic":
             return create_bot_file(name, safe_path)
 
-        template_map = {
-            "echo": EchoBot,
-            "reminder": ReminderBot,
-            "note": NoteBot,
-            "cogtest": CogTestBot,
-        }
-
-        if template_name not in template_map:
+        if template_name not in TEMPLATES:
             raise ValueError(
-                f"Invalid template: {template_name}. Available templates: basic, {', '.join(template_map.keys())}",
+                f"Invalid template: {template_name}. Available templates: basic, {', '.join(TEMPLATES.keys())}",
             )
 
-        template = f"""from lxmfy.templates import {template_map[template_name].__name__}
-
-if __name__ == "__main__":
-    bot = {template_map[template_name].__name__}()
-    bot.bot.name = "{name}"  # Set custom name
-    bot.run()
-"""
+        template = _TEMPLATE_BOT_TEMPLATE.format(
+            class_name=TEMPLATES[template_name].__name__,
+            name=name,
+        )
         with open(safe_path, "w", encoding="utf-8") as f:
             f.write(template)
 
@@ -553,21 +568,14 @@ To add admin rights, edit {bot_path} and add your LXMF hash to the admins list.
                 )
                 sys.exit(1)
 
-            template_map = {
-                "echo": EchoBot,
-                "reminder": ReminderBot,
-                "note": NoteBot,
-                "cogtest": CogTestBot,
-            }
-
-            if template_name not in template_map:
+            if template_name not in TEMPLATES:
                 print_error(
-                    f"Invalid template name '{template_name}'. Choose from: {', '.join(template_map.keys())}",
+                    f"Invalid template name '{template_name}'. Choose from: {', '.join(TEMPLATES.keys())}",
                 )
                 sys.exit(1)
 
             try:
-                BotClass = template_map[template_name]
+                BotClass = TEMPLATES[template_name]
                 print_header(f"Starting {template_name} Bot")
                 bot_instance = BotClass()
 
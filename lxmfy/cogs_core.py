@@ -29,8 +29,10 @@ def load_cogs_from_directory(bot, directory="cogs"):
         RNS.log(f"Created cogs directory: {cogs_dir}", RNS.LOG_INFO)
         return
 
-    if cogs_dir not in sys.path:
-        sys.path.insert(0, os.path.dirname(cogs_dir))
+    # The parent goes on sys.path so the directory imports as a package
+    cogs_parent = os.path.dirname(cogs_dir)
+    if cogs_parent not in sys.path:
+        sys.path.insert(0, cogs_parent)
 
     for filename in os.listdir(cogs_dir):
         if filename.endswith(".py") and not filename.startswith("_"):
@@ -133,6 +133,13 @@ class Colors:
         return ansi_escape.sub("", text)
 
 
+# (prefix, suffix) pairs for the status print functions, built once at import.
+_SUCCESS_STYLE = (f"{Colors.GREEN}{Colors.BOLD}✓ ", Colors.ENDC)
+_ERROR_STYLE = (f"{Colors.RED}{Colors.BOLD}✗ ", Colors.ENDC)
+_INFO_STYLE = (f"{Colors.BLUE}{Colors.BOLD}ℹ ", Colors.ENDC)
+_WARNING_STYLE = (f"{Colors.YELLOW}{Colors.BOLD}⚠ ", Colors.ENDC)
+
+
 def init_colors() -> bool:
     """Initialize color support for the current platform.
 
@@ -170,7 +177,7 @@ def print_success(text: str) -> None:
 
     """
     if Colors.is_colors_supported():
-        print(f"{Colors.GREEN}{Colors.BOLD}✓ {text}{Colors.ENDC}")
+        print(f"{_SUCCESS_STYLE[0]}{text}{_SUCCESS_STYLE[1]}")
     else:
         print(f"[SUCCESS] {text}")
 
@@ -183,7 +190,7 @@ def print_error(text: str) -> None:
 
     """
     if Colors.is_colors_supported():
-        print(f"{Colors.RED}{Colors.BOLD}✗ {text}{Colors.ENDC}")
+        print(f"{_ERROR_STYLE[0]}{text}{_ERROR_STYLE[1]}")
     else:
         print(f"[ERROR] {text}")
 
@@ -196,7 +203,7 @@ def print_info(text: str) -> None:
 
     """
     if Colors.is_colors_supported():
-        print(f"{Colors.BLUE}{Colors.BOLD}ℹ {text}{Colors.ENDC}")
+        print(f"{_INFO_STYLE[0]}{text}{_INFO_STYLE[1]}")
     else:
         print(f"[INFO] {text}")
 
@@ -209,7 +216,7 @@ def print_warning(text: str) -> None:
 
     """
     if Colors.is_colors_supported():
-        print(f"{Colors.YELLOW}{Colors.BOLD}⚠ {text}{Colors.ENDC}")
+        print(f"{_WARNING_STYLE[0]}{text}{_WARNING_STYLE[1]}")
     else:
         print(f"[WARNING] {text}")
 
@@ -239,6 +239,8 @@ class LXMFBot:
         def decorator(func):
             """The actual decorator that registers the command."""
             name = args[0] if len(args) > 0 else kwargs.get("name", func.__name__)
+            # Interned keys let lookups with an interned name match by identity
+            name = sys.intern(name)
 
             description = kwargs.get("description", "No description provided")
             admin_only = kwargs.get("admin_only", False)
@@ -314,7 +316,7 @@ class LXMFBot:
                     )
                     continue
 
-                self.commands[cmd.name] = cmd
+                self.commands[sys.intern(cmd.name)] = cmd
             except Exception as e:
                 self.logger.error(
                     "Error adding command %s from cog %s: %s",
@@ -356,7 +358,7 @@ class LXMFBot:
         """Process an incoming message."""
         try:
             content = message.content.decode("utf-8")
-            receipt = RNS.hexrep(message.hash, delimit=False)
+            receipt = message.hash.hex()
 
             def reply(response, **kwargs):
                 """Helper function to reply to a message."""
@@ -394,14 +396,14 @@ class LXMFBot:
                 return
 
             if self.command_prefix is None or content.startswith(self.command_prefix):
+                parts = content.split()
                 command_name = (
-                    content.split()[0][len(self.command_prefix) :]
+                    parts[0][len(self.command_prefix) :]
                     if self.command_prefix
-                    else content.split()[0]
+                    else parts[0]
                 )
-                if command_name in self.commands:
-                    cmd = self.commands[command_name]
-
+                cmd = self.commands.get(command_name)
+                if cmd is not None:
                     if not self.permissions.has_permission(sender, cmd.permissions):
                         self.send(
                             sender,
@@ -410,8 +412,7 @@ class LXMFBot:
                         return
 
                     try:
-                        args = content.split()[1:] if len(content.split()) > 1 else []
-                        msg.args = args
+                        msg.args = parts[1:]
                         msg.is_admin = sender in self.admins
 
                         if cmd.threaded:
@@ -442,8 +443,8 @@ class LXMFBot:
     def _message_received(self, message):
         """Handle received messages."""
         try:
-            sender = RNS.hexrep(message.source_hash, delimit=False)
-            receipt = RNS.hexrep(message.hash, delimit=False)
+            sender = message.source_hash.hex()
+            receipt = message.hash.hex()
 
             if receipt in self.receipts:
                 return
@@ -462,10 +463,13 @@ class LXMFBot:
             if self.middleware.execute(MiddlewareType.PRE_EVENT, ctx) is None:
                 return
 
-            event = Event("message_received", event_data)
-            self.events.dispatch(event)
+            cancelled = False
+            if self.events.has_handlers("message_received"):
+                event = Event("message_received", event_data)
+                self.events.dispatch(event)
+                cancelled = event.cancelled
 
-            if not event.cancelled:
+            if not cancelled:
                 # Verify message signature if enabled
                 if verify_incoming_message(self, message, sender):
                     self._process_message(message, sender)
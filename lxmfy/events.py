@@ -124,6 +124,35 @@ class EventManager:
 
         return decorator
 
+    def register_many(self, event_name: str, handlers):
+        """Registers several event handlers for an event in one call.
+
+        Handlers are sorted by priority once after all of them are added,
+        rather than once per handler as with repeated ``on`` calls.
+
+        Args:
+            event_name (str): The name of the event to handle.
+            handlers (Iterable[tuple[EventPriority, Callable]]): Pairs of priority and handler function.
+
+        """
+        event_handlers = self.handlers.setdefault(event_name, [])
+        event_handlers.extend(handlers)
+        event_handlers.sort(key=lambda x: x[0].value, reverse=True)
+
+    def has_handlers(self, event_name: str) -> bool:
+        """Checks whether any handler is registered for an event.
+
+        Callers can use this to skip building an Event nobody listens for.
+
+        Args:
+            event_name (str): The name of the event.
+
+        Returns:
+            bool: True if at least one handler is registered, False otherwise.
+
+        """
+        return bool(self.handlers.get(event_name))
+
     def use(self, middleware: Callable):
         """Adds middleware to the event pipeline.
 
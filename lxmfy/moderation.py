@@ -67,10 +67,19 @@ class SpamProtection:
 
     def save_data(self):
         """Save current spam protection data to storage."""
-        self.storage.set("spam:message_counts", dict(self.message_counts))
-        self.storage.set("spam:warnings", dict(self.warnings))
-        self.storage.set("spam:banned_users", list(self.banned_users))
-        self.storage.set("spam:warning_times", dict(self.warning_times))
+        items = {
+            "spam:message_counts": dict(self.message_counts),
+            "spam:warnings": dict(self.warnings),
+            "spam:banned_users": list(self.banned_users),
+            "spam:warning_times": dict(self.warning_times),
+        }
+        # Storage objects that only offer get/set are written key by key
+        set_many = getattr(self.storage, "set_many", None)
+        if set_many is not None:
+            set_many(items)
+        else:
+            for key, value in items.items():
+                self.storage.set(key, value)
 
     def check_spam(self, sender) -> tuple[bool, str]:
         """Check if a message from the sender should be allowed.
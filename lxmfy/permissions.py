@@ -125,11 +125,19 @@ class PermissionManager:
             for name, role in self.roles.items()
         }
 
-        self.storage.set("permissions:roles", roles_data)
-        self.storage.set(
-            "permissions:user_roles",
-            {user: list(roles) for user, roles in self.user_roles.items()},
-        )
+        items = {
+            "permissions:roles": roles_data,
+            "permissions:user_roles": {
+                user: list(roles) for user, roles in self.user_roles.items()
+            },
+        }
+        # Storage objects that only offer get/set are written key by key
+        set_many = getattr(self.storage, "set_many", None)
+        if set_many is not None:
+            set_many(items)
+        else:
+            for key, value in items.items():
+                self.storage.set(key, value)
 
     def create_role(
         self,
@@ -4,10 +4,15 @@ This module provides cryptographic signing and verification capabilities
 for LXMF messages using RNS Identity.
 """
 
+import hashlib
 import logging
+import struct
+import threading
+from time import monotonic
 
 import LXMF
 import RNS
+import RNS.vendor.umsgpack as msgpack
 
 from .permissions import DefaultPerms
 
@@ -15,6 +20,38 @@ logger = logging.getLogger(__name__)
 
 FIELD_SIGNATURE = 0xFA
 
+# Canonical signing layout: one record per present element made of a tag
+# byte, a little-endian u32 length and the raw value, hashed into a BLAKE2b
+# digest personalized with the layout version.
+CANONICAL_VERSION = 2
+DIGEST_SIZE = 64
+_PERSON = b"lxmfy-sig-v%d" % CANONICAL_VERSION
+_TAG_SOURCE = 1
+_TAG_DESTINATION = 2
+_TAG_CONTENT = 3
+_TAG_TITLE = 4
+_TAG_TIMESTAMP = 5
+_TAG_FIELD = 6
+_RECORD_HEADER = struct.Struct("<BI")
+_TIMESTAMP = struct.Struct("<d")
+
+# Ed25519 signatures have a fixed size, so anything else is rejected
+# before any lookup or curve arithmetic
+SIGNATURE_LENGTH = RNS.Identity.SIGLENGTH // 8
+
+# Recalled identities kept per manager, and how long a successful or failed
+# recall is remembered before the sender is looked up again
+IDENTITY_CACHE_SIZE = 4096
+IDENTITY_RECALL_TTL = 300.0
+NEGATIVE_RECALL_TTL = 30.0
+
+
+def _is_well_formed(signature) -> bool:
+    """Return True if signature has the shape of an Ed25519 signature."""
+    return (
+        isinstance(signature, (bytes, bytearray)) and len(signature) == SIGNATURE_LENGTH
+    )
+
 
 class SignatureManager:
     """Manages cryptographic signing and verification of messages."""
@@ -37,6 +74,46 @@ class SignatureManager:
         self.verification_enabled = verification_enabled
         self.require_signatures = require_signatures
         self.logger = logging.getLogger(__name__)
+        self._identities = {}
+        # Messages are verified from Reticulum callback threads
+        self._identities_lock = threading.Lock()
+
+    def _recall_identity(self, sender_hash: str) -> RNS.Identity | None:
+        """Recall a sender's identity, reusing earlier lookups.
+
+        Successful recalls are reused for ``IDENTITY_RECALL_TTL`` seconds
+        and failed ones for ``NEGATIVE_RECALL_TTL`` seconds, so announces
+        seen by Reticulum reach the cache without an announce handler.
+        When full, the least recently used entry is evicted. Entries are
+        keyed on the hex string, so a hit skips decoding it.
+
+        Args:
+            sender_hash: Hex string of the sender's identity hash.
+
+        Returns:
+            The recalled identity, or None if it is not known.
+
+        """
+        now = monotonic()
+        with self._identities_lock:
+            entry = self._identities.pop(sender_hash, None)
+            if entry is not None and now < entry[1]:
+                # Reinsert so dict order runs from least to most recently used
+                self._identities[sender_hash] = entry
+                return entry[0]
+        identity = RNS.Identity.recall(bytes.fromhex(sender_hash))
+        ttl = NEGATIVE_RECALL_TTL if identity is None else IDENTITY_RECALL_TTL
+        with self._identities_lock:
+            self._identities.pop(sender_hash, None)
+            if len(self._identities) >= IDENTITY_CACHE_SIZE:
+                del self._identities[next(iter(self._identities))]
+            self._identities[sender_hash] = (identity, now + ttl)
+        return identity
+
+    def clear_identity_cache(self):
+        """Forget recalled identities, e.g. after new announces arrive."""
+        with self._identities_lock:
+            self._identities.clear()
 
     def sign_message(self, message: LXMF.LXMessage, identity: RNS.Identity) -> bytes:
         """Sign an LXMF message using the provided identity.
@@ -76,11 +153,12 @@ class SignatureManager:
             True if signature is valid, False otherwise.
 
         """
+        if not _is_well_formed(signature):
+            return False
         try:
             identity_to_use = sender_identity
             if identity_to_use is None:
-                sender_hash_bytes = bytes.fromhex(sender_hash)
-                identity_to_use = RNS.Identity.recall(sender_hash_bytes)
+                identity_to_use = self._recall_identity(sender_hash)
                 if identity_to_use is None:
                     self.logger.warning(
                         "Could not recall identity for sender: %s",
@@ -93,41 +171,76 @@ class SignatureManager:
             self.logger.error("Failed to verify message signature: %s", str(e))
             return False
 
+    def verify_batch(self, items) -> list[bool]:
+        """Verify several message signatures in one call.
+
+        Sender identities are recalled through the manager's identity
+        cache, so a run of messages from the same sender pays for a single
+        lookup.
+
+        Args:
+            items: Iterable of ``(message, signature, sender_hash)`` tuples,
+                optionally with a fourth ``sender_identity`` element as
+                accepted by ``verify_message_signature``.
+
+        Returns:
+            One result per item, True where the signature is valid.
+
+        """
+        return [
+            self.verify_message_signature(message, signature, sender_hash, *rest)
+            for message, signature, sender_hash, *rest in items
+        ]
+
     @staticmethod
     def _canonicalize_message(message: LXMF.LXMessage) -> bytes:
-        """Create a canonical byte representation of a message for signing.
+        """Create the canonical digest of a message for signing.
+
+        Each non-empty element is fed to a BLAKE2b hash personalized with
+        ``CANONICAL_VERSION`` as one length-prefixed record, so no two
+        distinct messages share a transcript and the signer only ever sees
+        ``DIGEST_SIZE`` bytes, however long the content. Hashes, content
+        and title are hashed as raw bytes, the timestamp as a little-endian
+        double and each field except the signature as a msgpack
+        ``[id, value]`` pair, in field id order.
+
+        The version is only carried by the personalization, so signatures
+        made over an older layout do not verify and are rejected.
 
         Args:
             message: The LXMF message to canonicalize.
 
         Returns:
-            Canonical byte representation of the message.
+            Canonical digest of the message.
 
         """
-        canonical_data = []
-        if message.source_hash:
-            canonical_data.append(
-                b"source:" + RNS.hexrep(message.source_hash, delimit=False).encode(),
-            )
-        if message.destination_hash:
-            canonical_data.append(
-                b"dest:" + RNS.hexrep(message.destination_hash, delimit=False).encode(),
-            )
-        if message.content:
-            canonical_data.append(b"content:" + message.content)
-        if message.title:
-            canonical_data.append(b"title:" + message.title)
-        if hasattr(message, "timestamp") and message.timestamp:
-            canonical_data.append(b"timestamp:" + str(message.timestamp).encode())
-        if hasattr(message, "fields") and message.fields:
-            sorted_fields = sorted(
-                (k, v) for k, v in message.fields.items() if k != FIELD_SIGNATURE
-            )
-            for field_id, field_data in sorted_fields:
-                canonical_data.append(
-                    f"field_{field_id}:".encode() + str(field_data).encode(),
-                )
-        return b"|".join(canonical_data)
+        transcript = hashlib.blake2b(digest_size=DIGEST_SIZE, person=_PERSON)
+        # Bound once: every record is two updates, and most messages carry
+        # only the fixed elements below
+        update = transcript.update
+        header = _RECORD_HEADER.pack
+
+        for tag, value in (
+            (_TAG_SOURCE, message.source_hash),
+            (_TAG_DESTINATION, message.destination_hash),
+            (_TAG_CONTENT, message.content),
+            (_TAG_TITLE, message.title),
+        ):
+            if value:
+                update(header(tag, len(value)))
+                update(value)
+        timestamp = getattr(message, "timestamp", None)
+        if timestamp:
+            update(header(_TAG_TIMESTAMP, _TIMESTAMP.size))
+            update(_TIMESTAMP.pack(timestamp))
+        fields = getattr(message, "fields", None)
+        if fields:
+            for field_id in sorted(fields):
+                if field_id != FIELD_SIGNATURE:
+                    value = msgpack.packb([field_id, fields[field_id]])
+                    update(header(_TAG_FIELD, len(value)))
+                    update(value)
+        return transcript.digest()
 
     def should_verify_message(self, sender: str) -> bool:
         """Determine if a message from the given sender should be verified.
@@ -142,13 +255,10 @@ class SignatureManager:
         if not self.verification_enabled:
             return False
         # Only skip verification if permissions are enabled and user has bypass permission
-        if (
-            hasattr(self.bot, "permissions")
-            and self.bot.permissions.enabled
-            and self.bot.permissions.has_permission(sender, DefaultPerms.BYPASS_SPAM)
-        ):
-            return False
-        return True
+        permissions = getattr(self.bot, "permissions", None)
+        if permissions is None or not permissions.enabled:
+            return True
+        return not permissions.has_permission(sender, DefaultPerms.BYPASS_SPAM)
 
     def handle_unsigned_message(self, sender: str, message_hash: str) -> bool:
         """Handle a message that lacks a valid signature.
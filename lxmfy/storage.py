@@ -9,7 +9,9 @@ import base64
 import json
 import logging
 import sqlite3
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -109,6 +111,25 @@ def deserialize_value(obj: Any) -> Any:
     return obj
 
 
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """Return the smallest string greater than every string starting with prefix.
+
+    Args:
+        prefix: The key prefix.
+
+    Returns:
+        The exclusive upper bound, or None if the prefix has no upper bound.
+
+    """
+    for i in range(len(prefix) - 1, -1, -1):
+        code = ord(prefix[i]) + 1
+        if 0xD800 <= code <= 0xDFFF:
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix[:i] + chr(code)
+    return None
+
+
 class StorageBackend(ABC):
     """Abstract base class for storage backends."""
 
@@ -135,6 +156,19 @@ class StorageBackend(ABC):
 
         """
 
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Store several values in storage.
+
+        Backends that can write in one transaction override this; the
+        default stores each value in turn.
+
+        Args:
+            items: Mapping of keys to the values to store under them.
+
+        """
+        for key, value in items.items():
+            self.set(key, value)
+
     @abstractmethod
     def delete(self, key: str) -> None:
         """Delete a value from storage.
@@ -278,21 +312,63 @@ class JSONStorage(StorageBackend):
 class SQLiteStorage(StorageBackend):
     """SQLite database storage backend."""
 
+    _UPSERT_SQL = """
+        INSERT OR REPLACE INTO key_value (key, value, type, updated_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    """
+    # A range over the primary key uses its index, unlike LIKE, and treats
+    # "_" and "%" in the prefix literally
+    _SCAN_SQL = "SELECT key FROM key_value WHERE key >= ? ORDER BY key"
+    _SCAN_RANGE_SQL = (
+        "SELECT key FROM key_value WHERE key >= ? AND key < ? ORDER BY key"
+    )
+
     def __init__(self, database_path: str):
         """Initialize a new SQLiteStorage instance.
 
         Args:
-            database_path: The path to the SQLite database file.
+            database_path: The path to the SQLite database file, or ":memory:"
+                for a database that is not persisted.
 
         """
         self.database_path = database_path
         self.cache: dict[str, Any] = {}
         self.logger = logging.getLogger(__name__)
+        # An in-memory database only lives as long as its connection, so keep one open;
+        # the lock stops transactions from different threads interleaving on it
+        self._memory_conn = None
+        self._memory_lock = threading.Lock()
+        if database_path == ":memory:":
+            self._memory_conn = sqlite3.connect(
+                database_path,
+                check_same_thread=False,
+            )
         self._ensure_db_dir()
         self._init_db()
 
+    @contextmanager
+    def _connect(self):
+        """Open a transaction on the database.
+
+        The transaction commits when the block exits and rolls back if it
+        raises. In-memory databases share one connection, which is held
+        for the whole block.
+
+        Yields:
+            The shared connection for in-memory databases, otherwise a new one.
+
+        """
+        if self._memory_conn is None:
+            with sqlite3.connect(self.database_path) as conn:
+                yield conn
+            return
+        with self._memory_lock, self._memory_conn as conn:
+            yield conn
+
     def _ensure_db_dir(self):
         """Ensure the database directory exists."""
+        if self._memory_conn is not None:
+            return
         db_path = Path(self.database_path)
         db_dir = db_path.parent
         try:
@@ -308,7 +384,7 @@ class SQLiteStorage(StorageBackend):
     def _init_db(self):
         """Initialize the database table."""
         try:
-            with sqlite3.connect(self.database_path) as conn:
+            with self._connect() as conn:
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS key_value (
                         key TEXT PRIMARY KEY,
@@ -347,7 +423,7 @@ class SQLiteStorage(StorageBackend):
             return self.cache[key]
 
         try:
-            with sqlite3.connect(self.database_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.execute(
                     "SELECT value FROM key_value WHERE key = ?",
                     (key,),
@@ -373,24 +449,49 @@ class SQLiteStorage(StorageBackend):
 
         """
         try:
-            if isinstance(value, (dict, list)):
-                serialized = json.dumps(value)
-            else:
-                serialized = str(value)
-
-            with sqlite3.connect(self.database_path) as conn:
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO key_value (key, value, type, updated_at)
-                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                """,
-                    (key, serialized, type(value).__name__),
-                )
+            with self._connect() as conn:
+                conn.execute(self._UPSERT_SQL, self._row(key, value))
             self.cache[key] = value
         except Exception as e:
             self.logger.error("Error writing %s: %s", key, str(e))
             raise
 
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Store several values in a single transaction.
+
+        Args:
+            items: Mapping of keys to the values to store under them.
+
+        """
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    self._UPSERT_SQL,
+                    [self._row(key, value) for key, value in items.items()],
+                )
+            self.cache.update(items)
+        except Exception as e:
+            self.logger.error("Error writing %s: %s", ", ".join(items), str(e))
+            raise
+
+    @staticmethod
+    def _row(key: str, value: Any) -> tuple:
+        """Build the key_value row parameters for a value.
+
+        Args:
+            key: The key to store the value under.
+            value: The value to store.
+
+        Returns:
+            The key, serialized value and type name.
+
+        """
+        if isinstance(value, (dict, list)):
+            serialized = json.dumps(value)
+        else:
+            serialized = str(value)
+        return key, serialized, type(value).__name__
+
     def delete(self, key: str) -> None:
         """Delete a value from storage.
 
@@ -399,7 +500,7 @@ class SQLiteStorage(StorageBackend):
 
         """
         try:
-            with sqlite3.connect(self.database_path) as conn:
+            with self._connect() as conn:
                 conn.execute("DELETE FROM key_value WHERE key = ?", (key,))
             self.cache.pop(key, None)
         except Exception as e:
@@ -417,7 +518,7 @@ class SQLiteStorage(StorageBackend):
 
         """
         try:
-            with sqlite3.connect(self.database_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.execute("SELECT 1 FROM key_value WHERE key = ?", (key,))
                 return cursor.fetchone() is not None
         except Exception as e:
@@ -435,11 +536,12 @@ class SQLiteStorage(StorageBackend):
 
         """
         try:
-            with sqlite3.connect(self.database_path) as conn:
-                cursor = conn.execute(
-                    "SELECT key FROM key_value WHERE key LIKE ? ORDER BY key",
-                    (f"{prefix}%",),
-                )
+            upper = _prefix_upper_bound(prefix)
+            with self._connect() as conn:
+                if upper is None:
+                    cursor = conn.execute(self._SCAN_SQL, (prefix,))
+                else:
+                    cursor = conn.execute(self._SCAN_RANGE_SQL, (prefix, upper))
                 return [row[0] for row in cursor.fetchall()]
         except Exception as e:
             self.logger.error("Error scanning with prefix %s: %s", prefix, str(e))
@@ -483,6 +585,17 @@ class Storage:
         serialized = serialize_value(value)
         self.backend.set(key, serialized)
 
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Store several values, in one transaction where the backend allows.
+
+        Args:
+            items: Mapping of keys to the values to store under them.
+
+        """
+        self.backend.set_many(
+            {key: serialize_value(value) for key, value in items.items()},
+        )
+
     def delete(self, key: str) -> None:
         """Delete a value from storage.
 
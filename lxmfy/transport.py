@@ -110,7 +110,7 @@ class Transport:
             Exception: If the user does not have permission to establish links or if path lookup times out.
 
         """
-        sender = RNS.hexrep(destination_hash, delimit=False)
+        sender = destination_hash.hex()
         if not self.bot.permissions.has_permission(sender, DefaultPerms.USE_BOT):
             raise Exception("User does not have permission to establish links")
 
@@ -1,30 +1,86 @@
 """Test configuration and fixtures for LXMFy tests."""
 
+import contextlib
+import copy
+import itertools
 import os
+import shutil
 import tempfile
-from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 import RNS
-from LXMF import LXMRouter
+from LXMF import LXMessage, LXMRouter
 
 from lxmfy import BotConfig, LXMFBot
+from lxmfy.templates import CogTestBot, EchoBot, NoteBot, ReminderBot
+
+# Fixtures that make a test slow: starting Reticulum dominates suite setup time
+_SLOW_FIXTURES = frozenset({"reticulum_instance", "benchmark"})
+
+# Numbers the per-test bot directories under the worker's config directory
+_bot_ids = itertools.count()
+
+# Private Reticulum with no interfaces, so xdist workers stay independent
+_RETICULUM_TEST_CONFIG = """\
+[reticulum]
+  enable_transport = False
+  share_instance = No
+
+[logging]
+  loglevel = 0
+
+[interfaces]
+"""
+
+
+def pytest_configure(config):
+    """Register the speed markers wherever pytest picks up its config."""
+    config.addinivalue_line(
+        "markers",
+        "fast: tests that need no Reticulum instance or subprocess",
+    )
+    config.addinivalue_line(
+        "markers",
+        "slow: tests that start Reticulum, spawn the CLI or run benchmarks",
+    )
+
+
+def pytest_collection_modifyitems(items):
+    """Mark every test as fast or slow so ``-m fast`` gives a quick subset."""
+    for item in items:
+        if item.get_closest_marker("slow") or _SLOW_FIXTURES.intersection(
+            item.fixturenames,
+        ):
+            item.add_marker(pytest.mark.slow)
+        else:
+            item.add_marker(pytest.mark.fast)
 
 
 @pytest.fixture(scope="session")
-def test_config_dir():
-    """Create a temporary directory for test configurations."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        config_path = Path(temp_dir) / "test_config"
-        config_path.mkdir(exist_ok=True)
-        yield config_path
+def test_config_dir(tmp_path_factory, worker_id):
+    """Create a temporary directory for test configurations.
+
+    The directory is named after the xdist worker ("master" without
+    ``-n``) so concurrent workers never share bot storage or identities.
+    """
+    return tmp_path_factory.mktemp(f"test_config_{worker_id}")
 
 
 @pytest.fixture(scope="session")
 def reticulum_instance(test_config_dir):
     """Initialize a Reticulum instance for testing."""
+    # A non-test-mode bot may already have started Reticulum in this process
+    existing = RNS.Reticulum.get_instance()
+    if existing is not None:
+        yield existing
+        return
+
     config_dir = test_config_dir / "reticulum"
     config_dir.mkdir(exist_ok=True)
+    # A private instance with no interfaces keeps xdist workers from
+    # attaching to one another's shared instance
+    (config_dir / "config").write_text(_RETICULUM_TEST_CONFIG)
 
     # Initialize Reticulum with test config
     reticulum = RNS.Reticulum(
@@ -32,22 +88,132 @@ def reticulum_instance(test_config_dir):
         loglevel=RNS.LOG_CRITICAL,  # Minimize logging in tests
         verbosity=0,
     )
-    return reticulum
-    # Cleanup will happen automatically with temp directory
+    yield reticulum
+    # Persist and detach once at session end; the handler is idempotent,
+    # so the atexit hook Reticulum registers becomes a no-op.
+    RNS.Reticulum.exit_handler()
+
+
+@pytest.fixture(scope="session")
+def _bot_skeleton(tmp_path_factory):
+    """Lay out the working directory a bot expects, once per session."""
+    skeleton = tmp_path_factory.mktemp("bot_skeleton")
+    cogs_dir = skeleton / "config" / "cogs"
+    cogs_dir.mkdir(parents=True)
+    (cogs_dir / "__init__.py").touch()
+    RNS.Identity().to_file(str(skeleton / "config" / "identity"))
+    return skeleton
+
+
+@pytest.fixture(scope="function")
+def bot_workdir(_bot_skeleton, tmp_path, monkeypatch):
+    """Run the test from a fresh copy of the bot skeleton directory.
+
+    Bots keep their identity, router storage and cogs under the current
+    working directory, so this keeps them out of the repository checkout.
+    """
+    workdir = tmp_path / "bot"
+    shutil.copytree(_bot_skeleton, workdir)
+    monkeypatch.chdir(workdir)
+    return workdir
+
+
+@pytest.fixture(scope="session")
+def _template_dir(_bot_skeleton, tmp_path_factory):
+    """Working directory the shared template bots are built and used in."""
+    workdir = tmp_path_factory.mktemp("template_bots")
+    shutil.copytree(_bot_skeleton, workdir, dirs_exist_ok=True)
+    return workdir
 
 
 @pytest.fixture(scope="function")
-def test_identity(reticulum_instance, test_config_dir):
+def template_workdir(_template_dir, monkeypatch):
+    """Run the test from the shared template bots' working directory.
+
+    Template bots open storage at paths relative to the current working
+    directory, such as ``data/notes``, on every read and write.
+    """
+    monkeypatch.chdir(_template_dir)
+    return _template_dir
+
+
+def _shared_template(template_cls, workdir):
+    """Build a test-mode template bot, yield it, then clean it up."""
+    with contextlib.chdir(workdir):
+        template = template_cls(test_mode=True)
+    yield template
+    with contextlib.chdir(workdir):
+        template.bot.cleanup()
+
+
+@pytest.fixture(scope="session")
+def echo_bot(_template_dir):
+    """Share one EchoBot across tests that run from ``template_workdir``."""
+    yield from _shared_template(EchoBot, _template_dir)
+
+
+@pytest.fixture(scope="session")
+def note_bot(_template_dir):
+    """Share one NoteBot across tests that run from ``template_workdir``."""
+    yield from _shared_template(NoteBot, _template_dir)
+
+
+@pytest.fixture(scope="session")
+def reminder_bot(_template_dir):
+    """Share one ReminderBot across tests that run from ``template_workdir``."""
+    yield from _shared_template(ReminderBot, _template_dir)
+
+
+@pytest.fixture(scope="session")
+def cogtest_bot(_template_dir):
+    """Share one CogTestBot across tests that run from ``template_workdir``."""
+    yield from _shared_template(CogTestBot, _template_dir)
+
+
+@pytest.fixture(scope="function")
+def test_identity():
     """Create a test identity."""
     identity = RNS.Identity()
     return identity
 
 
+@pytest.fixture(scope="session")
+def cached_identity():
+    """Create one identity shared by tests that do not need a fresh keypair."""
+    return RNS.Identity()
+
+
+@pytest.fixture(scope="session")
+def shared_identity(tmp_path_factory):
+    """Generate one identity and its key file for tests that build bots.
+
+    Returns:
+        Tuple of the identity and the path of its serialized key file.
+
+    """
+    identity = RNS.Identity()
+    path = tmp_path_factory.mktemp("id") / "identity"
+    identity.to_file(str(path))
+    return identity, path
+
+
 @pytest.fixture(scope="function")
-def test_destination(test_identity, test_config_dir):
-    """Create a test destination for messaging."""
+def shared_identity_loader(shared_identity, monkeypatch):
+    """Make RNS.Identity.from_file return the shared identity for one test."""
+    identity, _ = shared_identity
+    monkeypatch.setattr(RNS.Identity, "from_file", lambda path: identity)
+    return shared_identity
+
+
+@pytest.fixture(scope="session")
+def test_destination(cached_identity, reticulum_instance):
+    """Create a test destination for messaging.
+
+    Inbound destinations can only be registered once per identity and
+    aspect, so this is shared for the session.
+    """
     dest = RNS.Destination(
-        test_identity,
+        cached_identity,
         RNS.Destination.IN,
         RNS.Destination.SINGLE,
         "lxmf",
@@ -57,14 +223,20 @@ def test_destination(test_identity, test_config_dir):
     return dest
 
 
-@pytest.fixture(scope="function")
-def lxmf_router(test_identity, test_config_dir):
-    """Create an LXMF router for testing."""
+@pytest.fixture(scope="session")
+def test_destination_hexhash(test_destination):
+    """Hex-encoded hash of the shared test destination, as bots address it."""
+    return test_destination.hash.hex()
+
+
+@pytest.fixture(scope="session")
+def lxmf_router(cached_identity, reticulum_instance, test_config_dir):
+    """Create an LXMF router shared by the session's tests."""
     storage_path = test_config_dir / "lxmf_storage"
     storage_path.mkdir(exist_ok=True)
 
     router = LXMRouter(
-        identity=test_identity,
+        identity=cached_identity,
         storagepath=str(storage_path),
         autopeer=False,  # Disable auto-peering in tests
         propagation_limit=10,
@@ -73,7 +245,7 @@ def lxmf_router(test_identity, test_config_dir):
 
     # Register delivery identity (creates destination internally)
     delivery_destination = router.register_delivery_identity(
-        test_identity,
+        cached_identity,
         display_name="TestRouter",
     )
 
@@ -84,8 +256,63 @@ def lxmf_router(test_identity, test_config_dir):
 
 
 @pytest.fixture(scope="function")
-def test_bot_config(test_config_dir):
-    """Create a test bot configuration."""
+def make_propagation_bot(_bot_skeleton, reticulum_instance, tmp_path):
+    """Factory for Reticulum-backed bots, cleaned up after the test.
+
+    Propagation settings are applied to the router at start-up, so each
+    configuration needs its own bot. Every bot gets its own working
+    directory and identity because a delivery identity can only be
+    registered once.
+    """
+    bots = []
+
+    def build(**config_kwargs):
+        workdir = tmp_path / f"propagation_bot_{len(bots)}"
+        shutil.copytree(_bot_skeleton, workdir)
+        identity = RNS.Identity()
+        config = BotConfig(storage_path=str(workdir / "storage"), **config_kwargs)
+        with contextlib.chdir(workdir), pytest.MonkeyPatch.context() as mp:
+            mp.setattr(RNS.Identity, "from_file", lambda path: identity)
+            bot = LXMFBot(**config.__dict__)
+        bots.append(bot)
+        return bot
+
+    yield build
+
+    for bot in bots:
+        bot.cleanup()
+
+
+@pytest.fixture(scope="session")
+def lxmf_message_proto(lxmf_router):
+    """Outbound LXMF message from the shared router to its own identity.
+
+    Tests should take a copy through ``lxmf_message`` rather than
+    changing or sending the prototype itself.
+    """
+    destination = RNS.Destination(
+        lxmf_router.identity,
+        RNS.Destination.OUT,
+        RNS.Destination.SINGLE,
+        "lxmf",
+        "delivery",
+    )
+    return LXMessage(
+        destination=destination,
+        source=lxmf_router._test_delivery_dest,
+        content=b"Test message content",
+        title=b"Test Title",
+    )
+
+
+@pytest.fixture(scope="function")
+def lxmf_message(lxmf_message_proto):
+    """Give a test its own shallow copy of the LXMF message prototype."""
+    return copy.copy(lxmf_message_proto)
+
+
+def _make_test_bot_config(storage_path):
+    """Build the bot configuration shared by the bot fixtures."""
     return BotConfig(
         name="TestBot",
         announce=0,  # Disable announcing in tests
@@ -100,7 +327,7 @@ def test_bot_config(test_config_dir):
         cogs_enabled=False,
         permissions_enabled=False,
         storage_type="json",
-        storage_path=str(test_config_dir / "bot_storage"),
+        storage_path=storage_path,
         first_message_enabled=False,
         signature_verification_enabled=False,
         require_message_signatures=False,
@@ -108,15 +335,18 @@ def test_bot_config(test_config_dir):
     )
 
 
+@pytest.fixture(scope="function")
+def test_bot_config(test_config_dir):
+    """Create a test bot configuration."""
+    return _make_test_bot_config(str(test_config_dir / "bot_storage"))
+
+
 @pytest.fixture(scope="function")
 def test_bot(test_bot_config, test_config_dir):
     """Create a test bot instance."""
     # Override config_path for testing
-    # Use a unique config path per test
-    import uuid
-
-    unique_config_path = test_config_dir / f"bot_{uuid.uuid4().hex[:8]}"
-    unique_config_path.mkdir(exist_ok=True)
+    # Use a unique config path per test; storage creates it on demand
+    unique_config_path = test_config_dir / f"bot_{next(_bot_ids)}"
 
     config = test_bot_config.__dict__.copy()
     config["storage_path"] = str(unique_config_path / "storage")
@@ -133,6 +363,118 @@ def test_bot(test_bot_config, test_config_dir):
         pass
 
 
+@pytest.fixture(params=["json", "sqlite"])
+def storage_bot(request, test_config_dir):
+    """Create a test bot for each supported storage backend."""
+    unique_config_path = test_config_dir / f"bot_{next(_bot_ids)}"
+
+    # SQLite runs in memory so no database file is left behind
+    storage_path = str(unique_config_path / "storage")
+    if request.param == "sqlite":
+        storage_path = ":memory:"
+
+    config = _make_test_bot_config(storage_path)
+    config.storage_type = request.param
+    bot = LXMFBot(**config.__dict__)
+    bot.config_path = str(unique_config_path)
+
+    yield bot
+
+    try:
+        bot.cleanup()
+    except Exception:
+        pass
+
+
+@pytest.fixture(scope="session")
+def shared_bot(test_config_dir):
+    """Create a bot instance shared by tests that only read its state.
+
+    Tests that register commands, handlers or change admins should use
+    ``clean_shared_bot``; tests that write to storage should use ``test_bot``.
+    """
+    config_path = test_config_dir / "shared_bot"
+    config_path.mkdir(exist_ok=True)
+
+    config = _make_test_bot_config(str(config_path / "storage"))
+    bot = LXMFBot(**config.__dict__)
+    bot.config_path = str(config_path)
+
+    yield bot
+
+    try:
+        bot.cleanup()
+    except Exception:
+        pass
+
+
+@pytest.fixture(scope="function")
+def clean_shared_bot(shared_bot):
+    """Lend the shared bot to a test that registers commands, cogs or handlers.
+
+    The command, cog and event handler registries and the admin set are
+    restored after the test.
+    """
+    commands = shared_bot.commands.copy()
+    cogs = shared_bot.cogs.copy()
+    handlers = {name: list(pairs) for name, pairs in shared_bot.events.handlers.items()}
+    admins = shared_bot.admins.copy()
+
+    yield shared_bot
+
+    shared_bot.commands.clear()
+    shared_bot.commands.update(commands)
+    shared_bot.cogs.clear()
+    shared_bot.cogs.update(cogs)
+    shared_bot.events.handlers.clear()
+    shared_bot.events.handlers.update(handlers)
+    shared_bot.admins.clear()
+    shared_bot.admins.update(admins)
+
+
+class _MockContext:
+    """Minimal command context that records replies."""
+
+    __slots__ = ("args", "content", "responses", "sender")
+
+    def __init__(self, sender="test_user", args=None, content=""):
+        self.sender = sender
+        self.args = args or []
+        self.content = content
+        self.responses = []
+
+    def reply(self, message, **kwargs):
+        self.responses.append(message)
+
+
+@pytest.fixture(scope="session")
+def mock_ctx():
+    """Factory for command contexts that record replies in ``responses``."""
+    return _MockContext
+
+
+@pytest.fixture(scope="session")
+def _message_proto():
+    """Incoming message prototype with the fields the bot reads preset."""
+    return SimpleNamespace(
+        content=b"",
+        hash=b"message_hash",
+        source_hash=b"test_hash",
+    )
+
+
+@pytest.fixture(scope="session")
+def make_message(_message_proto):
+    """Factory for incoming messages copied from the shared prototype."""
+
+    def make(content):
+        message = copy.copy(_message_proto)
+        message.content = content
+        return message
+
+    return make
+
+
 @pytest.fixture(scope="function")
 def test_message_data():
     """Sample message data for testing."""
@@ -158,15 +500,3 @@ def temp_file():
         os.unlink(temp_path)
     except Exception:
         pass
-
-
-@pytest.fixture(autouse=True)
-def cleanup_reticulum():
-    """Clean up Reticulum state between tests."""
-    yield
-    # Force cleanup of any lingering links or destinations
-    try:
-        # This is a best-effort cleanup
-        pass
-    except Exception:
-        pass
@@ -1,11 +1,15 @@
 """Tests for LXMFy CLI functionality."""
 
+import builtins
 import os
-from unittest.mock import MagicMock, patch
+import sys
+from unittest.mock import MagicMock
 
 import pytest
 
+from lxmfy import cli as _cli
 from lxmfy.cli import (
+    TEMPLATES,
     create_bot_file,
     create_example_cog,
     create_from_template,
@@ -29,191 +33,195 @@ from lxmfy.colors import (
     print_warning,
 )
 
+_EXPECTED_COLORS = {
+    "HEADER": "\033[95m",
+    "BLUE": "\033[94m",
+    "CYAN": "\033[96m",
+    "GREEN": "\033[92m",
+    "YELLOW": "\033[93m",
+    "RED": "\033[91m",
+    "ENDC": "\033[0m",
+    "BOLD": "\033[1m",
+    "UNDERLINE": "\033[4m",
+}
+
 
 class TestColors:
     """Test Colors class."""
 
     def test_colors_defined(self):
         """Test that all color constants are defined."""
-        assert Colors.HEADER == "\033[95m"
-        assert Colors.BLUE == "\033[94m"
-        assert Colors.CYAN == "\033[96m"
-        assert Colors.GREEN == "\033[92m"
-        assert Colors.YELLOW == "\033[93m"
-        assert Colors.RED == "\033[91m"
-        assert Colors.ENDC == "\033[0m"
-        assert Colors.BOLD == "\033[1m"
-        assert Colors.UNDERLINE == "\033[4m"
+        actual = {name: getattr(Colors, name) for name in _EXPECTED_COLORS}
+        assert actual == _EXPECTED_COLORS
+
+
+@pytest.fixture
+def printed(monkeypatch):
+    """Record printed lines instead of writing them to stdout."""
+    lines = []
+    monkeypatch.setattr(
+        builtins,
+        "print",
+        lambda *args, **kwargs: lines.append(" ".join(map(str, args))),
+    )
+    return lines
+
+
+@pytest.fixture
+def colors_enabled(monkeypatch):
+    """Force color output on regardless of the terminal."""
+    monkeypatch.setattr(Colors, "_colors_enabled", True)
+
 
+def _feed_input(monkeypatch, *answers):
+    """Answer successive input() prompts with the given strings."""
+    replies = iter(answers)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(replies))
 
+
+@pytest.mark.usefixtures("colors_enabled")
 class TestPrintFunctions:
     """Test print utility functions."""
 
-    @patch("lxmfy.colors.Colors.is_colors_supported", return_value=True)
-    @patch("builtins.print")
-    def test_print_header(self, mock_print, mock_colors):
+    def test_print_header(self, printed):
         """Test print_header function."""
         print_header("Test Header")
-        mock_print.assert_called()
-
-    @patch("lxmfy.colors.Colors.is_colors_supported", return_value=True)
-    @patch("builtins.print")
-    def test_print_success(self, mock_print, mock_colors):
-        """Test print_success function."""
-        print_success("Test message")
-        mock_print.assert_called_with(
-            f"{Colors.GREEN}{Colors.BOLD}✓ Test message{Colors.ENDC}",
-        )
-
-    @patch("lxmfy.colors.Colors.is_colors_supported", return_value=True)
-    @patch("builtins.print")
-    def test_print_error(self, mock_print, mock_colors):
-        """Test print_error function."""
-        print_error("Test error")
-        mock_print.assert_called_with(
-            f"{Colors.RED}{Colors.BOLD}✗ Test error{Colors.ENDC}",
-        )
-
-    @patch("lxmfy.colors.Colors.is_colors_supported", return_value=True)
-    @patch("builtins.print")
-    def test_print_info(self, mock_print, mock_colors):
-        """Test print_info function."""
-        print_info("Test info")
-        mock_print.assert_called_with(
-            f"{Colors.BLUE}{Colors.BOLD}ℹ Test info{Colors.ENDC}",
-        )
-
-    @patch("lxmfy.colors.Colors.is_colors_supported", return_value=True)
-    @patch("builtins.print")
-    def test_print_warning(self, mock_print, mock_colors):
-        """Test print_warning function."""
-        print_warning("Test warning")
-        mock_print.assert_called_with(
-            f"{Colors.YELLOW}{Colors.BOLD}⚠ Test warning{Colors.ENDC}",
-        )
-
-    @patch("lxmfy.colors.Colors.is_colors_supported", return_value=True)
-    @patch("builtins.print")
-    def test_print_menu(self, mock_print, mock_colors):
+        assert printed
+
+    @pytest.mark.parametrize(
+        ("func", "color", "symbol"),
+        [
+            (print_success, Colors.GREEN, "✓"),
+            (print_error, Colors.RED, "✗"),
+            (print_info, Colors.BLUE, "ℹ"),
+            (print_warning, Colors.YELLOW, "⚠"),
+        ],
+        ids=["success", "error", "info", "warning"],
+    )
+    def test_print_message(self, printed, func, color, symbol):
+        """Test each message printer applies its color and symbol."""
+        func("Test message")
+        assert printed == [f"{color}{Colors.BOLD}{symbol} Test message{Colors.ENDC}"]
+
+    def test_print_menu(self, printed):
         """Test print_menu function."""
         print_menu()
-        assert mock_print.call_count > 5
+        assert len(printed) > 5
 
 
 class TestInputFunctions:
     """Test input handling functions."""
 
-    @patch("builtins.input")
-    def test_get_user_choice_valid(self, mock_input):
+    def test_get_user_choice_valid(self, monkeypatch):
         """Test get_user_choice with valid input."""
-        mock_input.return_value = "1"
+        _feed_input(monkeypatch, "1")
         result = get_user_choice()
         assert result == "1"
 
-    @patch("builtins.input")
-    @patch("lxmfy.cli.print_error")
-    def test_get_user_choice_invalid_then_valid(self, mock_print_error, mock_input):
+    def test_get_user_choice_invalid_then_valid(self, monkeypatch):
         """Test get_user_choice with invalid then valid input."""
-        mock_input.side_effect = ["4", "2"]
+        errors = []
+        _feed_input(monkeypatch, "4", "2")
+        monkeypatch.setattr(_cli, "print_error", errors.append)
         result = get_user_choice()
         assert result == "2"
-        mock_print_error.assert_called_once()
+        assert len(errors) == 1
 
-    @patch("builtins.input")
-    @patch("lxmfy.cli.validate_bot_name")
-    def test_get_bot_name_valid(self, mock_validate, mock_input):
+    def test_get_bot_name_valid(self, monkeypatch):
         """Test get_bot_name with valid input."""
-        mock_input.return_value = "testbot"
-        mock_validate.return_value = "testbot"
+        _feed_input(monkeypatch, "testbot")
+        monkeypatch.setattr(_cli, "validate_bot_name", lambda name: name)
         result = get_bot_name()
         assert result == "testbot"
 
-    @patch("builtins.input")
-    @patch("lxmfy.cli.print_error")
-    @patch("lxmfy.cli.validate_bot_name")
-    def test_get_bot_name_invalid_then_valid(
-        self,
-        mock_validate,
-        mock_print_error,
-        mock_input,
-    ):
+    def test_get_bot_name_invalid_then_valid(self, monkeypatch):
         """Test get_bot_name with invalid then valid input."""
-        mock_validate.side_effect = [ValueError("Invalid"), "validbot"]
-        mock_input.side_effect = ["invalid", "validbot"]
+
+        def validate(name):
+            if name == "invalid":
+                raise ValueError("Invalid")
+            return name
+
+        errors = []
+        _feed_input(monkeypatch, "invalid", "validbot")
+        monkeypatch.setattr(_cli, "validate_bot_name", validate)
+        monkeypatch.setattr(_cli, "print_error", errors.append)
         result = get_bot_name()
         assert result == "validbot"
-        mock_print_error.assert_called_once()
+        assert len(errors) == 1
 
-    @patch("builtins.input")
-    def test_get_template_choice_valid(self, mock_input):
+    def test_get_template_choice_valid(self, monkeypatch):
         """Test get_template_choice with valid input."""
-        mock_input.side_effect = ["1"]  # Choose basic template
+        _feed_input(monkeypatch, "1")  # Choose basic template
         result = get_template_choice()
         assert result == "basic"
 
-    @patch("builtins.input")
-    @patch("lxmfy.cli.print_error")
-    def test_get_template_choice_invalid_then_valid(self, mock_print_error, mock_input):
+    def test_get_template_choice_invalid_then_valid(self, monkeypatch):
         """Test get_template_choice with invalid then valid input."""
-        mock_input.side_effect = ["6", "3"]  # Invalid then reminder
+        errors = []
+        _feed_input(monkeypatch, "6", "3")  # Invalid then reminder
+        monkeypatch.setattr(_cli, "print_error", errors.append)
         result = get_template_choice()
         assert result == "reminder"
-        mock_print_error.assert_called_once()
+        assert len(errors) == 1
 
 
 class TestUtilityFunctions:
     """Test utility functions."""
 
-    def test_sanitize_filename_basic(self):
-        """Test sanitize_filename with basic filename."""
-        result = sanitize_filename("test file!.txt")
-        assert result == "testfile.py"  # Removes special chars and forces .py extension
-
-    def test_sanitize_filename_no_extension(self):
-        """Test sanitize_filename with no extension."""
-        result = sanitize_filename("test file!")
-        assert result == "testfile.py"
-
-    def test_sanitize_filename_extension_override(self):
-        """Test sanitize_filename forces .py extension."""
-        result = sanitize_filename("test.js")
-        assert result == "test.py"  # Forces .py extension
-
-    def test_validate_bot_name_valid(self):
-        """Test validate_bot_name with valid name."""
-        result = validate_bot_name("TestBot123")
-        assert result == "TestBot123"
-
-    def test_validate_bot_name_with_spaces(self):
-        """Test validate_bot_name with spaces and special chars."""
-        result = validate_bot_name("Test Bot!")
-        assert result == "Test Bot"  # Removes special chars
-
-    def test_validate_bot_name_empty(self):
-        """Test validate_bot_name with empty string."""
-        with pytest.raises(ValueError, match="Bot name cannot be empty"):
-            validate_bot_name("")
-
-    def test_validate_bot_name_only_special(self):
-        """Test validate_bot_name with only special characters."""
-        with pytest.raises(ValueError, match="Bot name must contain valid characters"):
-            validate_bot_name("!@#$%")
-
-    def test_is_safe_path_no_base(self):
-        """Test is_safe_path without base path."""
-        assert is_safe_path("/some/path") is True
-
-    def test_is_safe_path_safe(self):
-        """Test is_safe_path with safe path."""
-        assert is_safe_path("/base/safe/path", "/base") is True
-
-    def test_is_safe_path_unsafe(self):
-        """Test is_safe_path with unsafe path."""
-        assert is_safe_path("/unsafe/path", "/base") is False
-
-    def test_is_safe_path_invalid(self):
-        """Test is_safe_path with invalid path."""
-        assert is_safe_path("", "/base") is False
+    @pytest.mark.parametrize(
+        "inp,expected",
+        [
+            ("test file!.txt", "testfile.py"),
+            ("test file!", "testfile.py"),
+            ("test.js", "test.py"),
+        ],
+    )
+    def test_sanitize_filename(self, inp, expected):
+        """Test sanitize_filename strips special chars and forces .py."""
+        assert sanitize_filename(inp) == expected
+
+    @pytest.mark.parametrize(
+        "name,expected",
+        [
+            ("TestBot123", "TestBot123"),
+            ("Test Bot!", "Test Bot"),
+        ],
+    )
+    def test_validate_bot_name_valid(self, name, expected):
+        """Test validate_bot_name keeps valid names and strips special chars."""
+        assert validate_bot_name(name) == expected
+
+    @pytest.mark.parametrize(
+        "name,message",
+        [
+            ("", "Bot name cannot be empty"),
+            ("!@#$%", "Bot name must contain valid characters"),
+        ],
+    )
+    def test_validate_bot_name_invalid(self, name, message):
+        """Test validate_bot_name rejects empty and all-special names."""
+        with pytest.raises(ValueError, match=message):
+            validate_bot_name(name)
+
+    @pytest.mark.parametrize(
+        "path,base,expected",
+        [
+            ("/some/path", None, True),
+            ("/base/safe/path", "/base", True),
+            ("/unsafe/path", "/base", False),
+            ("", "/base", False),
+        ],
+    )
+    def test_is_safe_path(self, path, base, expected):
+        """Test is_safe_path with and without a base path."""
+        assert is_safe_path(path, base) is expected
+
+
+@pytest.fixture(scope="module")
+def template_dir(tmp_path_factory):
+    """Share one output directory between tests that write distinct files."""
+    return tmp_path_factory.mktemp("templates")
 
 
 class TestFileCreation:
@@ -264,25 +272,23 @@ class TestFileCreation:
             assert "from lxmfy import Command" in content
             assert "class BasicCommands:" in content
 
-    def test_create_from_template_basic(self, tmp_path):
-        """Test create_from_template with basic template."""
-        output_path = tmp_path / "test_bot.py"
-        result = create_from_template("basic", str(output_path), "TestBot")
-
-        assert os.path.exists(output_path)
-        assert result.endswith("test_bot.py")
-
-    def test_create_from_template_echo(self, tmp_path):
-        """Test create_from_template with echo template."""
-        output_path = tmp_path / "echo_bot.py"
-        result = create_from_template("echo", str(output_path), "EchoBot")
-
-        assert os.path.exists(output_path)
-        assert result.endswith("echo_bot.py")
-
-        with open(output_path) as f:
-            content = f.read()
-            assert "from lxmfy.templates import EchoBot" in content
+    @pytest.mark.parametrize(
+        ("template", "name", "marker"),
+        [
+            ("basic", "TestBot", "from lxmfy import LXMFBot"),
+            ("echo", "EchoBot", "from lxmfy.templates import EchoBot"),
+            ("reminder", "ReminderBot", "from lxmfy.templates import ReminderBot"),
+            ("note", "NoteBot", "from lxmfy.templates import NoteBot"),
+            ("cogtest", "CogBot", "from lxmfy.templates import CogTestBot"),
+        ],
+    )
+    def test_create_from_template(self, template_dir, template, name, marker):
+        """Test create_from_template writes each template's bot file."""
+        output_path = template_dir / f"{template}_bot.py"
+        result = create_from_template(template, str(output_path), name)
+
+        assert result.endswith(f"{template}_bot.py")
+        assert marker in output_path.read_text()
 
     def test_create_from_template_invalid(self, tmp_path):
         """Test create_from_template with invalid template."""
@@ -294,140 +300,119 @@ class TestFileCreation:
 class TestInteractiveFunctions:
     """Test interactive functions."""
 
-    @patch("builtins.input")
-    @patch("lxmfy.cli.create_from_template")
-    @patch("lxmfy.cli.print_success")
-    @patch("lxmfy.cli.print_info")
-    def test_interactive_create_basic(
-        self,
-        mock_print_info,
-        mock_print_success,
-        mock_create,
-        mock_input,
-    ):
+    @pytest.fixture
+    def created(self, monkeypatch, tmp_path):
+        """Record create_from_template calls and run from a scratch directory."""
+        calls = []
+
+        def create(template, output_path, bot_name):
+            calls.append((template, output_path, bot_name))
+            return output_path
+
+        # interactive_create writes the example cog next to the bot file
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(_cli, "create_from_template", create)
+        return calls
+
+    def test_interactive_create_basic(self, monkeypatch, printed, created):
         """Test interactive_create with basic template."""
-        mock_input.side_effect = ["TestBot", "1", "test_bot.py"]
-        mock_create.return_value = "test_bot.py"
+        _feed_input(monkeypatch, "TestBot", "1", "test_bot.py")
 
         interactive_create()
 
-        mock_create.assert_called_once_with("basic", "test_bot.py", "TestBot")
-        mock_print_success.assert_called()
-        mock_print_info.assert_called()
-
-    @patch("builtins.input")
-    @patch("lxmfy.cli.create_from_template")
-    @patch("lxmfy.cli.print_success")
-    @patch("lxmfy.cli.print_info")
-    def test_interactive_create_with_cog(
-        self,
-        mock_print_info,
-        mock_print_success,
-        mock_create,
-        mock_input,
-    ):
+        assert created == [("basic", "test_bot.py", "TestBot")]
+        assert printed
+
+    def test_interactive_create_with_cog(self, monkeypatch, printed, created):
         """Test interactive_create creates example cog."""
-        mock_input.side_effect = ["TestBot", "1", ""]  # Empty output path
-        mock_create.return_value = "TestBot.py"
+        _feed_input(monkeypatch, "TestBot", "1", "")  # Empty output path
 
         interactive_create()
 
-        mock_create.assert_called_once_with("basic", "TestBot.py", "TestBot")
-
-    @patch("builtins.input")
-    @patch("builtins.print")
-    @patch("lxmfy.cli.print_header")
-    @patch("lxmfy.cli.get_template_choice")
-    def test_interactive_run(
-        self,
-        mock_get_template,
-        mock_print_header,
-        mock_print,
-        mock_input,
-    ):
+        assert created == [("basic", "TestBot.py", "TestBot")]
+
+    def test_interactive_run(self, monkeypatch, printed):
         """Test interactive_run function."""
-        mock_input.side_effect = ["CustomName"]
-        mock_get_template.return_value = "echo"
+        _feed_input(monkeypatch, "CustomName")
+        monkeypatch.setattr(_cli, "get_template_choice", lambda: "echo")
 
         # Mock the EchoBot template
-        with patch("lxmfy.cli.EchoBot") as mock_echo_bot:
-            mock_bot_instance = MagicMock()
-            mock_echo_bot.return_value = mock_bot_instance
+        mock_echo_bot = MagicMock()
+        mock_bot_instance = MagicMock()
+        mock_echo_bot.return_value = mock_bot_instance
+        monkeypatch.setitem(TEMPLATES, "echo", mock_echo_bot)
 
-            interactive_run()
+        interactive_run()
 
-            mock_echo_bot.assert_called_once()
-            mock_bot_instance.run.assert_called_once()
+        mock_echo_bot.assert_called_once()
+        mock_bot_instance.run.assert_called_once()
 
 
 class TestMainFunction:
     """Test main function."""
 
-    @patch("sys.argv", ["lxmfy"])
-    @patch("lxmfy.cli.interactive_mode")
-    def test_main_interactive_mode(self, mock_interactive):
+    def test_main_interactive_mode(self, monkeypatch):
         """Test main function calls interactive_mode when no args."""
+        calls = []
+        monkeypatch.setattr(sys, "argv", ["lxmfy"])
+        monkeypatch.setattr(_cli, "interactive_mode", lambda: calls.append(()))
         main()
-        mock_interactive.assert_called_once()
-
-    @patch("sys.argv", ["lxmfy", "create", "testbot"])
-    @patch("lxmfy.cli.create_from_template")
-    @patch("lxmfy.cli.print_success")
-    @patch("lxmfy.cli.print_info")
-    def test_main_create_command(
-        self,
-        mock_print_info,
-        mock_print_success,
-        mock_create,
-    ):
+        assert len(calls) == 1
+
+    def test_main_create_command(self, monkeypatch, tmp_path):
         """Test main function create command."""
-        mock_create.return_value = "testbot.py"
+        # The basic template writes its example cog into the working directory
+        monkeypatch.chdir(tmp_path)
+        created = []
+        successes = []
+        infos = []
+
+        def create(*args):
+            created.append(args)
+            return "testbot.py"
+
+        monkeypatch.setattr(sys, "argv", ["lxmfy", "create", "testbot"])
+        monkeypatch.setattr(_cli, "create_from_template", create)
+        monkeypatch.setattr(_cli, "print_success", successes.append)
+        monkeypatch.setattr(_cli, "print_info", infos.append)
 
         main()
 
-        mock_create.assert_called_once_with("basic", "testbot.py", "testbot")
-        mock_print_success.assert_called()
-        mock_print_info.assert_called()
+        assert created == [("basic", "testbot.py", "testbot")]
+        assert successes
+        assert infos
 
-    @patch("sys.argv", ["lxmfy", "run", "echo"])
-    @patch("lxmfy.cli.EchoBot")
-    def test_main_run_command(self, mock_echo_bot):
+    def test_main_run_command(self, monkeypatch):
         """Test main function run command."""
+        mock_echo_bot = MagicMock()
         mock_bot_instance = MagicMock()
         mock_echo_bot.return_value = mock_bot_instance
 
+        monkeypatch.setattr(sys, "argv", ["lxmfy", "run", "echo"])
+        monkeypatch.setitem(TEMPLATES, "echo", mock_echo_bot)
         main()
 
         mock_echo_bot.assert_called_once()
         mock_bot_instance.run.assert_called_once()
 
-    @patch("sys.argv", ["lxmfy", "signatures", "test"])
-    @patch("builtins.print")
-    def test_main_signatures_test(self, mock_print):
-        """Test main function signatures test command."""
+    @pytest.mark.parametrize(
+        ("subcommand", "min_lines"),
+        [("test", 6), ("enable", 1), ("disable", 1)],
+    )
+    def test_main_signatures(self, monkeypatch, printed, subcommand, min_lines):
+        """Test main function signatures subcommands print their output."""
+        monkeypatch.setattr(sys, "argv", ["lxmfy", "signatures", subcommand])
         main()
-        # Should print signature test messages
-        assert mock_print.call_count > 5
+        assert len(printed) >= min_lines
 
-    @patch("sys.argv", ["lxmfy", "signatures", "enable"])
-    @patch("builtins.print")
-    def test_main_signatures_enable(self, mock_print):
-        """Test main function signatures enable command."""
-        main()
-        mock_print.assert_called()
-
-    @patch("sys.argv", ["lxmfy", "signatures", "disable"])
-    @patch("builtins.print")
-    def test_main_signatures_disable(self, mock_print):
-        """Test main function signatures disable command."""
-        main()
-        mock_print.assert_called()
-
-    @patch("sys.argv", ["lxmfy", "signatures", "invalid"])
-    @patch("lxmfy.cli.print_error")
-    @patch("lxmfy.cli.print_info")
-    def test_main_signatures_invalid(self, mock_print_info, mock_print_error):
+    def test_main_signatures_invalid(self, monkeypatch):
         """Test main function signatures invalid command."""
+        errors = []
+        infos = []
+        monkeypatch.setattr(sys, "argv", ["lxmfy", "signatures", "invalid"])
+        monkeypatch.setattr(_cli, "print_error", errors.append)
+        monkeypatch.setattr(_cli, "print_info", infos.append)
+
         # This should not crash and should print error messages
         try:
             main()
@@ -435,7 +420,5 @@ class TestMainFunction:
             pass  # Expected when invalid subcommand is provided
 
         # Should print error about unknown subcommand
-        mock_print_error.assert_called_with("Unknown subcommand: invalid")
-        mock_print_info.assert_called_with(
-            "Available subcommands: test, enable, disable",
-        )
+        assert errors[-1] == "Unknown subcommand: invalid"
+        assert infos[-1] == "Available subcommands: test, enable, disable"
@@ -1,11 +1,34 @@
 """Tests for LXMFy client functionality and RNS/LXMF integration."""
 
-from unittest.mock import Mock
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
+import LXMF
+import pytest
 import RNS
 from LXMF import LXMessage
 
 from lxmfy import BotConfig, LXMFBot
+from lxmfy.attachments import Attachment, AttachmentType, pack_attachment
+
+FILE = AttachmentType.FILE
+IMAGE = AttachmentType.IMAGE
+AUDIO = AttachmentType.AUDIO
+
+
+def _noop(*args, **kwargs):
+    """Stand-in for calls whose effects tests need to skip."""
+
+
+def _delivery_destination(identity):
+    """Build an outbound LXMF delivery destination for an identity."""
+    return RNS.Destination(
+        identity,
+        RNS.Destination.OUT,
+        RNS.Destination.SINGLE,
+        "lxmf",
+        "delivery",
+    )
 
 
 class TestRNSBasicFunctionality:
@@ -18,10 +41,10 @@ class TestRNSBasicFunctionality:
         assert identity.hash is not None
         assert len(identity.hash) == RNS.Reticulum.TRUNCATED_HASHLENGTH // 8
 
-    def test_destination_creation(self, test_identity, reticulum_instance):
+    def test_destination_creation(self, cached_identity, reticulum_instance):
         """Test RNS destination creation."""
         dest = RNS.Destination(
-            test_identity,
+            cached_identity,
             RNS.Destination.IN,
             RNS.Destination.SINGLE,
             "test",
@@ -34,7 +57,7 @@ class TestRNSBasicFunctionality:
         assert dest.direction == RNS.Destination.IN
         assert dest.type == RNS.Destination.SINGLE
 
-    def test_identity_recalling(self, test_identity):
+    def test_identity_recalling(self, test_identity, reticulum_instance):
         """Test identity recall functionality."""
         # Store identity hash
         identity_hash = test_identity.hash
@@ -77,41 +100,21 @@ class TestRNSBasicFunctionality:
 class TestLXMFMessageHandling:
     """Test LXMF message creation and handling."""
 
-    def test_lxmf_message_creation(self, lxmf_router, test_identity):
+    def test_lxmf_message_creation(self, lxmf_router, lxmf_message):
         """Test creating LXMF messages."""
-        # Create a destination for the message
-        dest = RNS.Destination(
-            test_identity,
-            RNS.Destination.OUT,
-            RNS.Destination.SINGLE,
-            "lxmf",
-            "delivery",
-        )
+        dest_hash = RNS.Destination.hash(lxmf_router.identity, "lxmf", "delivery")
 
-        message = LXMessage(
-            destination=dest,
-            source=lxmf_router._test_delivery_dest,
-            content=b"Test message content",
-            title=b"Test Title",
-        )
+        assert lxmf_message.content == b"Test message content"
+        assert lxmf_message.title == b"Test Title"
+        assert lxmf_message.source_hash == lxmf_router._test_delivery_dest.hash
+        assert lxmf_message.destination_hash == dest_hash
 
-        assert message.content == b"Test message content"
-        assert message.title == b"Test Title"
-        assert message.source_hash == lxmf_router._test_delivery_dest.hash
-        assert message.destination_hash == dest.hash
-
-    def test_lxmf_message_fields(self, lxmf_router, test_identity):
+    def test_lxmf_message_fields(self, lxmf_router):
         """Test LXMF message with custom fields."""
         from lxmfy.signatures import FIELD_SIGNATURE
 
         # Create destination
-        dest = RNS.Destination(
-            test_identity,
-            RNS.Destination.OUT,
-            RNS.Destination.SINGLE,
-            "lxmf",
-            "delivery",
-        )
+        dest = _delivery_destination(lxmf_router.identity)
 
         message = LXMessage(
             destination=dest,
@@ -127,35 +130,24 @@ class TestLXMFMessageHandling:
         assert message.fields["custom_field"] == "custom_value"
         assert message.fields[FIELD_SIGNATURE] == b"signature_data"
 
-    def test_lxmf_router_operations(self, lxmf_router, test_identity):
+    def test_lxmf_router_operations(self, lxmf_router, lxmf_message):
         """Test LXMF router operations."""
         # Test delivery identity
         delivery_id = lxmf_router._test_delivery_dest
         assert delivery_id is not None
+        assert lxmf_router.storagepath is not None
 
         # Test message handling
-        dest = RNS.Destination(
-            test_identity,
-            RNS.Destination.OUT,
-            RNS.Destination.SINGLE,
-            "lxmf",
-            "delivery",
-        )
-
-        message = LXMessage(
-            destination=dest,
-            source=lxmf_router._test_delivery_dest,
-            content=b"Router test message",
-        )
+        lxmf_message.set_content_from_bytes(b"Router test message")
 
         # Should handle outbound without errors
-        lxmf_router.handle_outbound(message)
+        lxmf_router.handle_outbound(lxmf_message)
 
 
 class TestClientBotInteraction:
     """Test client-side interaction with bots."""
 
-    def test_client_message_creation(self, test_bot):
+    def test_client_message_creation(self, test_bot, monkeypatch):
         """Test creating client messages to send to bots."""
         # Mock the send method to capture what would be sent
         sent_messages = []
@@ -177,8 +169,7 @@ class TestClientBotInteraction:
                 },
             )
 
-        original_send = test_bot.send
-        test_bot.send = mock_send
+        monkeypatch.setattr(test_bot, "send", mock_send)
 
         # Send a test message
         test_bot.send(
@@ -195,9 +186,7 @@ class TestClientBotInteraction:
         assert msg["title"] == "Test Message"
         assert msg["fields"] == {"custom": "field"}
 
-        test_bot.send = original_send
-
-    def test_client_command_simulation(self, test_bot):
+    def test_client_command_simulation(self, test_bot, make_message, monkeypatch):
         """Test simulating client sending commands to bot."""
         # Register a command
         command_responses = []
@@ -208,17 +197,14 @@ class TestClientBotInteraction:
             ctx.reply(f"Hello {ctx.sender}!")
 
         # Mock message reception
-        mock_message = Mock()
-        mock_message.content = b"/greet"
-        mock_message.hash = b"message_hash_123"  # Mock hash attribute
+        mock_message = make_message(b"/greet")
 
         sent_replies = []
 
         def mock_send(dest, msg, title=None, **kwargs):
             sent_replies.append((dest, msg, title))
 
-        original_send = test_bot.send
-        test_bot.send = mock_send
+        monkeypatch.setattr(test_bot, "send", mock_send)
 
         # Process the command message
         test_bot._process_message(mock_message, "client_hash_123")
@@ -233,15 +219,11 @@ class TestClientBotInteraction:
         assert dest == "client_hash_123"
         assert reply_msg == "Hello client_hash_123!"
 
-        test_bot.send = original_send
-
-    def test_client_attachment_handling(self, test_bot):
+    def test_client_attachment_handling(self, test_bot, monkeypatch):
         """Test client sending messages with attachments."""
-        from lxmfy.attachments import Attachment, AttachmentType
-
         # Create a test attachment
         attachment = Attachment(
-            type=AttachmentType.FILE,
+            type=FILE,
             name="test.txt",
             data=b"Test file content",
             format="txt",
@@ -261,8 +243,7 @@ class TestClientBotInteraction:
                 },
             )
 
-        original_send = test_bot.send
-        test_bot.send = mock_send
+        monkeypatch.setattr(test_bot, "send", mock_send)
 
         # Send message with attachment
         test_bot.send_with_attachment(
@@ -280,7 +261,40 @@ class TestClientBotInteraction:
         assert 5 in attachment_msg["fields"]
         assert attachment_msg["fields"][5] == [["test.txt", b"Test file content"]]
 
-        test_bot.send = original_send
+
+class TestAttachmentPacking:
+    """Test packing attachments into LXMF fields."""
+
+    @pytest.mark.parametrize(
+        ("attachment", "expected_field", "expected_value"),
+        [
+            (
+                Attachment(FILE, "test.txt", b"data", "txt"),
+                LXMF.FIELD_FILE_ATTACHMENTS,
+                [["test.txt", b"data"]],
+            ),
+            (
+                Attachment(IMAGE, "image.png", b"data", "png"),
+                LXMF.FIELD_IMAGE,
+                ["png", b"data"],
+            ),
+            (
+                Attachment(AUDIO, "audio.ogg", b"data", "16"),
+                LXMF.FIELD_AUDIO,
+                [16, b"data"],
+            ),
+            (Attachment(0xFF, "unknown.bin", b"data"), None, None),
+        ],
+        ids=["file", "image", "audio", "unsupported"],
+    )
+    def test_pack_attachment(self, attachment, expected_field, expected_value):
+        """Test each attachment type packs into its LXMF field."""
+        if expected_field is None:
+            with pytest.raises(ValueError, match="Unsupported attachment type"):
+                pack_attachment(attachment)
+            return
+
+        assert pack_attachment(attachment) == {expected_field: expected_value}
 
 
 # Signature tests are covered in test_core.py
@@ -309,38 +323,49 @@ class TestNetworkPathOperations:
         test_bot.transport.load_paths()
         test_bot.transport.save_paths()
 
+    def test_bot_network_operations(self):
+        """Test that a bot's send is callable with a destination and message."""
+        bot = SimpleNamespace(send=_noop)
 
+        bot.send("test_destination_hash", "Test message")
+
+        assert callable(bot.send)
+
+
+@pytest.mark.slow
 class TestReticulumIntegration:
     """Test deep Reticulum network integration."""
 
-    def test_reticulum_identity_persistence(self, test_config_dir):
+    def test_reticulum_identity_persistence(self, tmp_path, monkeypatch):
         """Test identity persistence across bot restarts."""
-        from unittest import mock
+        # Start from an empty working directory so the first bot creates the
+        # identity file and the second one has to load it back
+        monkeypatch.chdir(tmp_path)
+        config_dir = tmp_path / "identity_test"
 
-        config_dir = test_config_dir / "identity_test"
+        # Mock LXMRouter to avoid RNS conflicts; Reticulum startup and
+        # destination registration only need to be skipped, not recorded
+        monkeypatch.setattr("lxmfy.core.LXMRouter", MagicMock())
+        monkeypatch.setattr("lxmfy.core.RNS.Reticulum", _noop)
+        monkeypatch.setattr("lxmfy.core.RNS.Transport.register_destination", _noop)
 
-        # Mock LXMRouter to avoid RNS conflicts
-        with (
-            mock.patch("lxmfy.core.LXMRouter"),
-            mock.patch("lxmfy.core.RNS.Reticulum"),
-            mock.patch("lxmfy.core.RNS.Transport.register_destination"),
-        ):
-            # Create first bot instance
-            config1 = BotConfig(storage_path=str(config_dir / "storage1"))
-            bot1 = LXMFBot(**config1.__dict__)
-            bot1.config_path = str(config_dir)
+        # Create first bot instance
+        config1 = BotConfig(storage_path=str(config_dir / "storage1"))
+        bot1 = LXMFBot(**config1.__dict__)
+        bot1.config_path = str(config_dir)
 
-            identity_hash = RNS.hexrep(bot1.identity.hash, delimit=False)
+        identity_hash = bot1.identity.hash.hex()
 
-            # Create second bot instance (should recall same identity)
-            config2 = BotConfig(storage_path=str(config_dir / "storage2"))
-            bot2 = LXMFBot(**config2.__dict__)
-            bot2.config_path = str(config_dir)
+        # Create second bot instance (should recall same identity)
+        config2 = BotConfig(storage_path=str(config_dir / "storage2"))
+        bot2 = LXMFBot(**config2.__dict__)
+        bot2.config_path = str(config_dir)
 
-            identity_hash2 = RNS.hexrep(bot2.identity.hash, delimit=False)
+        identity_hash2 = bot2.identity.hash.hex()
 
-            # Should be the same identity (persisted)
-            assert identity_hash == identity_hash2
+        # Should be the same identity (persisted)
+        assert (tmp_path / "config" / "identity").is_file()
+        assert identity_hash == identity_hash2
 
     def test_link_establishment_simulation(self, test_destination):
         """Test link establishment process (simulated)."""
@@ -355,8 +380,8 @@ class TestReticulumIntegration:
         # Clean up
         link.teardown()
 
-    def test_bot_network_operations(self, test_bot):
-        """Test bot's network operations."""
+    def test_bot_send_real(self, test_bot):
+        """Test a real bot's send against the test network."""
         # Test that send method exists and can be called
         # (without mocking complex network operations)
         dest_hash = "test_destination_hash"
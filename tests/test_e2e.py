@@ -1,358 +1,285 @@
 """End-to-end tests for LXMFy CLI and full bot functionality."""
 
-import subprocess
-import tempfile
-import time
+import sys
 from pathlib import Path
 
-from lxmfy import BotConfig, LXMFBot
+import pytest
+
+from lxmfy import BotConfig, LXMFBot, cli
+from lxmfy.colors import Colors
+
+
+def _run_cli(monkeypatch, capsys, *args):
+    """Run the CLI entry point in-process and return what it printed."""
+    # main() caches terminal color support; restore it afterwards
+    monkeypatch.setattr(Colors, "_colors_enabled", Colors._colors_enabled)
+    monkeypatch.setattr(sys, "argv", ["lxmfy", *args])
+    cli.main()
+    return capsys.readouterr().out
 
 
 class TestCLIE2E:
     """End-to-end tests for CLI functionality."""
 
-    def test_cli_create_basic_bot(self, test_config_dir):
+    @pytest.fixture(autouse=True)
+    def _cli_cwd(self, test_config_dir, monkeypatch):
+        """Run CLI commands from the shared test config directory."""
+        monkeypatch.chdir(test_config_dir)
+
+    def test_cli_create_basic_bot(self, tmp_path, monkeypatch, capsys):
         """Test CLI bot creation."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            bot_path = Path(temp_dir) / "test_bot.py"
-
-            # Run CLI create command
-            cmd = [
-                "python",
-                "-m",
-                "lxmfy.cli",
-                "create",
-                "testbot",
-                "--output",
-                str(bot_path),
-            ]
-
-            result = subprocess.run(
-                cmd,
-                check=False,
-                capture_output=True,
-                text=True,
-                cwd=test_config_dir,
-            )
-
-            assert result.returncode == 0
-            assert "Bot created successfully" in result.stdout
-            assert bot_path.exists()
-
-            # Verify bot file content
-            with open(bot_path) as f:
-                content = f.read()
-
-            assert "LXMFBot" in content
-            assert "testbot" in content
-
-    def test_cli_run_echo_bot(self, test_config_dir):
-        """Test CLI running echo bot template."""
-        # This test would start a bot process, but for CI we just verify
-        # the command doesn't fail immediately
-        cmd = [
-            "python",
-            "-m",
-            "lxmfy.cli",
-            "run",
-            "echo",
-            "--name",
-            "TestEchoBot",
-        ]
-
-        # Start the bot in a subprocess
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=test_config_dir,
-            text=True,
+        bot_path = tmp_path / "test_bot.py"
+
+        output = _run_cli(
+            monkeypatch, capsys, "create", "testbot", "--output", str(bot_path)
         )
 
-        # Let it run for a few seconds
-        time.sleep(3)
+        assert "Bot created successfully" in output
+        assert bot_path.exists()
 
-        # Terminate the process
-        process.terminate()
-        process.wait(timeout=5)
+        # Verify bot file content
+        content = bot_path.read_text()
+        assert "LXMFBot" in content
+        assert "testbot" in content
 
-        # Should have started without immediate errors
-        assert process.returncode == 0 or process.returncode == -15  # SIGTERM
+    def test_cli_run_echo_bot(self, echo_bot):
+        """Test the echo template the CLI 'run echo' command starts."""
+        assert isinstance(echo_bot, cli.TEMPLATES["echo"])
+        assert echo_bot.bot.router is None
+        assert "echo" in echo_bot.bot.commands
 
-    def test_cli_signatures_test(self, test_config_dir):
+    def test_cli_signatures_test(self, monkeypatch, capsys):
         """Test CLI signatures functionality."""
-        cmd = [
-            "python",
-            "-m",
-            "lxmfy.cli",
-            "signatures",
-            "test",
-        ]
-
-        result = subprocess.run(
-            cmd,
-            check=False,
-            capture_output=True,
-            text=True,
-            cwd=test_config_dir,
-        )
+        output = _run_cli(monkeypatch, capsys, "signatures", "test")
 
-        # Should complete successfully
-        assert result.returncode == 0
-        assert "signature test" in result.stdout.lower()
+        assert "signature test" in output.lower()
 
-    def test_cli_signatures_enable_disable(self, test_config_dir):
+    def test_cli_signatures_enable_disable(self, monkeypatch, capsys):
         """Test CLI signatures enable/disable instructions."""
-        # Test enable command
-        cmd_enable = [
-            "python",
-            "-m",
-            "lxmfy.cli",
-            "signatures",
-            "enable",
-        ]
-
-        result = subprocess.run(
-            cmd_enable,
-            check=False,
-            capture_output=True,
-            text=True,
-            cwd=test_config_dir,
-        )
+        output = _run_cli(monkeypatch, capsys, "signatures", "enable")
+        assert "signature_verification_enabled=True" in output
 
-        assert result.returncode == 0
-        assert "signature_verification_enabled=True" in result.stdout
-
-        # Test disable command
-        cmd_disable = [
-            "python",
-            "-m",
-            "lxmfy.cli",
-            "signatures",
-            "disable",
-        ]
-
-        result = subprocess.run(
-            cmd_disable,
-            check=False,
-            capture_output=True,
-            text=True,
-            cwd=test_config_dir,
-        )
+        output = _run_cli(monkeypatch, capsys, "signatures", "disable")
+        assert "signature_verification_enabled=False" in output
 
-        assert result.returncode == 0
-        assert "signature_verification_enabled=False" in result.stdout
 
+@pytest.fixture(scope="module")
+def storage_paths(test_config_dir):
+    """Storage path for each lifecycle test bot, built once per module."""
+    return {
+        name: str(test_config_dir / f"{name}_storage")
+        for name in ("lifecycle", "command", "cog", "secure", "perm")
+    }
 
-class TestFullBotLifecycle:
-    """Test complete bot lifecycle from creation to operation."""
 
-    def test_bot_creation_and_startup(self, test_config_dir):
-        """Test creating and starting a bot."""
-        config = BotConfig(
-            name="LifecycleTestBot",
-            announce=0,  # Disable announcing
-            announce_enabled=False,
-            storage_path=str(test_config_dir / "lifecycle_storage"),
-            cogs_enabled=False,
-            permissions_enabled=False,
-            test_mode=True,
-        )
+_TEST_COG_SOURCE = """
+from lxmfy import Command
 
-        bot = LXMFBot(**config.__dict__)
-        bot.config_path = str(test_config_dir)
+class TestCog:
+    def __init__(self, bot):
+        self.bot = bot
 
-        assert bot.config.name == "LifecycleTestBot"
-        assert bot.router is None  # Should be None in test mode
-        assert bot.local is None  # Should be None in test mode
+    @Command("cog_hello", "Hello from cog")
+    def cog_hello(self, ctx):
+        ctx.reply("Hello from cog!")
 
-        # Test cleanup
-        bot.cleanup()
+def setup(bot):
+    bot.add_cog(TestCog(bot))
+"""
 
-    def test_bot_with_commands(self, test_config_dir):
-        """Test bot with custom commands."""
-        config = BotConfig(
-            name="CommandTestBot",
-            announce_enabled=False,
-            storage_path=str(test_config_dir / "command_storage"),
-            cogs_enabled=False,
-            test_mode=True,
-        )
 
-        bot = LXMFBot(**config.__dict__)
-        bot.config_path = str(test_config_dir)
+def _check_startup(bot, config_dir):
+    """Check a test-mode bot starts without router or local destination."""
+    assert bot.config.name == "LifecycleTestBot"
+    assert bot.router is None  # Should be None in test mode
+    assert bot.local is None  # Should be None in test mode
 
-        # Add test commands
-        @bot.command("hello")
-        def hello_cmd(ctx):
-            ctx.reply("Hello from test bot!")
 
-        @bot.command("echo", admin_only=True)
-        def echo_cmd(ctx, message: str):
-            ctx.reply(message)
+def _check_commands(bot, config_dir):
+    """Check custom commands register with their properties."""
 
-        assert "hello" in bot.commands
-        assert "echo" in bot.commands
+    @bot.command("hello")
+    def hello_cmd(ctx):
+        ctx.reply("Hello from test bot!")
 
-        # Test command properties
-        echo_cmd_obj = bot.commands["echo"]
-        assert echo_cmd_obj.admin_only is True
+    @bot.command("echo", admin_only=True)
+    def echo_cmd(ctx, message: str):
+        ctx.reply(message)
 
-        bot.cleanup()
+    assert "hello" in bot.commands
+    assert "echo" in bot.commands
+    assert bot.commands["echo"].admin_only is True
 
-    def test_bot_with_cogs(self, test_config_dir):
-        """Test bot with cog extensions."""
-        config = BotConfig(
-            name="CogTestBot",
-            announce_enabled=False,
-            storage_path=str(test_config_dir / "cog_storage"),
-            cogs_enabled=True,
-            cogs_dir=str(test_config_dir / "test_cogs"),
-            test_mode=True,
-        )
 
-        bot = LXMFBot(**config.__dict__)
-        bot.config_path = str(test_config_dir)
+def _check_cogs(bot, config_dir):
+    """Check a cog written to the cogs directory loads its commands."""
+    from lxmfy import load_cogs_from_directory
 
-        # Create test cog
-        cogs_dir = Path(test_config_dir) / "cogs"
-        cogs_dir.mkdir(exist_ok=True)
+    cogs_dir = Path(config_dir) / "cogs"
+    cogs_dir.mkdir(exist_ok=True)
+    (cogs_dir / "__init__.py").write_text("")
+    (cogs_dir / "test_cog.py").write_text(_TEST_COG_SOURCE)
 
-        init_file = cogs_dir / "__init__.py"
-        init_file.write_text("")
+    load_cogs_from_directory(bot, "cogs")
 
-        cog_file = cogs_dir / "test_cog.py"
-        cog_file.write_text("""
-from lxmfy import Command
+    assert "cog_hello" in bot.commands
 
-class TestCog:
-    def __init__(self, bot):
-        self.bot = bot
 
-    @Command("cog_hello", "Hello from cog")
-    def cog_hello(self, ctx):
-        ctx.reply("Hello from cog!")
+def _check_signatures(bot, config_dir):
+    """Check signature verification settings reach the manager."""
+    assert bot.signature_manager.verification_enabled is True
+    assert bot.signature_manager.require_signatures is False
+    assert bot.signature_manager.should_verify_message("test_user") is True
 
-def setup(bot):
-    bot.add_cog(TestCog(bot))
-""")
 
-        # Load cogs
-        from lxmfy import load_cogs_from_directory
+def _check_permissions(bot, config_dir):
+    """Check roles can be created and grant permissions to users."""
+    from lxmfy.permissions import DefaultPerms
 
-        load_cogs_from_directory(bot, "cogs")
+    assert bot.permissions.enabled is True
+
+    role = bot.permissions.create_role(
+        "moderator",
+        DefaultPerms.MANAGE_MESSAGES,
+    )
+    assert role.name == "moderator"
 
-        assert "cog_hello" in bot.commands
+    bot.permissions.assign_role("test_user", "moderator")
+    assert bot.permissions.has_permission("test_user", DefaultPerms.MANAGE_MESSAGES)
 
-        bot.cleanup()
 
-    def test_bot_with_signatures(self, test_config_dir):
-        """Test bot with cryptographic signature verification."""
+class TestFullBotLifecycle:
+    """Test complete bot lifecycle from creation to operation."""
+
+    @pytest.mark.usefixtures("bot_workdir")
+    @pytest.mark.parametrize(
+        "storage,overrides,check",
+        [
+            pytest.param(
+                "lifecycle",
+                {
+                    "name": "LifecycleTestBot",
+                    "announce": 0,
+                    "cogs_enabled": False,
+                    "permissions_enabled": False,
+                },
+                _check_startup,
+                id="startup",
+            ),
+            pytest.param(
+                "command",
+                {"name": "CommandTestBot", "cogs_enabled": False},
+                _check_commands,
+                id="commands",
+            ),
+            pytest.param(
+                "cog",
+                {"name": "CogTestBot", "cogs_enabled": True, "cogs_dir": "test_cogs"},
+                _check_cogs,
+                id="cogs",
+            ),
+            pytest.param(
+                "secure",
+                {
+                    "name": "SecureBot",
+                    "signature_verification_enabled": True,
+                    "require_message_signatures": False,
+                },
+                _check_signatures,
+                id="signatures",
+            ),
+            pytest.param(
+                "perm",
+                {"name": "PermBot", "permissions_enabled": True},
+                _check_permissions,
+                id="permissions",
+            ),
+        ],
+    )
+    def test_bot_lifecycle(
+        self, request, test_config_dir, storage_paths, storage, overrides, check
+    ):
+        """Test building a test-mode bot with each feature configuration."""
         config = BotConfig(
-            name="SecureBot",
             announce_enabled=False,
-            storage_path=str(test_config_dir / "secure_storage"),
-            signature_verification_enabled=True,
-            require_message_signatures=False,
+            storage_path=storage_paths[storage],
             test_mode=True,
+            **overrides,
         )
 
         bot = LXMFBot(**config.__dict__)
+        request.addfinalizer(bot.cleanup)
         bot.config_path = str(test_config_dir)
 
-        assert bot.signature_manager.verification_enabled is True
-        assert bot.signature_manager.require_signatures is False
+        check(bot, test_config_dir)
 
-        # Test signature manager functionality
-        assert bot.signature_manager.should_verify_message("test_user") is True
+    def test_cog_loader_reuses_imports(self, request, tmp_path, monkeypatch):
+        """Test loading the same cogs again adds no modules or sys.path entries."""
+        from lxmfy import load_cogs_from_directory
 
-        bot.cleanup()
+        cogs_dir = tmp_path / "cogs"
+        cogs_dir.mkdir()
+        (cogs_dir / "__init__.py").write_text("")
+        (cogs_dir / "reuse_cog.py").write_text("""
+def setup(bot):
+    bot.setup_calls.append("reuse_cog")
+""")
+        # Import this directory's cogs package, not one left by another test
+        monkeypatch.delitem(sys.modules, "cogs", raising=False)
+        monkeypatch.setattr(sys, "path", list(sys.path))
 
-    def test_bot_with_permissions(self, test_config_dir):
-        """Test bot with permission system enabled."""
-        config = BotConfig(
-            name="PermBot",
+        bot = LXMFBot(
+            name="CogReuseBot",
             announce_enabled=False,
-            storage_path=str(test_config_dir / "perm_storage"),
-            permissions_enabled=True,
+            storage_path=str(tmp_path / "storage"),
+            cogs_enabled=False,
             test_mode=True,
         )
+        request.addfinalizer(bot.cleanup)
+        bot.config_path = str(tmp_path)
+        bot.setup_calls = []
 
-        bot = LXMFBot(**config.__dict__)
-        bot.config_path = str(test_config_dir)
-
-        assert bot.permissions.enabled is True
-
-        from lxmfy.permissions import DefaultPerms
-
-        # Test role creation
-        role = bot.permissions.create_role(
-            "moderator",
-            DefaultPerms.MANAGE_MESSAGES,
-        )
-        assert role.name == "moderator"
+        load_cogs_from_directory(bot, "cogs")
+        path_len = len(sys.path)
+        modules = set(sys.modules)
 
-        # Test user permission assignment
-        bot.permissions.assign_role("test_user", "moderator")
-        assert bot.permissions.has_permission("test_user", DefaultPerms.MANAGE_MESSAGES)
+        load_cogs_from_directory(bot, "cogs")
 
-        bot.cleanup()
+        assert len(sys.path) == path_len
+        assert set(sys.modules) == modules
+        assert bot.setup_calls == ["reuse_cog", "reuse_cog"]
 
 
+@pytest.mark.usefixtures("template_workdir")
 class TestTemplateBotOperations:
     """Test that template bots can perform basic operations."""
 
-    def test_echo_bot_operations(self, test_config_dir):
+    def test_echo_bot_operations(self, echo_bot, mock_ctx):
         """Test echo bot can handle commands."""
-        from lxmfy.templates import EchoBot
-
-        echo_bot = EchoBot(test_mode=True)
-
         # Verify commands are registered
         assert "echo" in echo_bot.bot.commands
 
-        # Mock a context for testing
-        class MockContext:
-            def __init__(self):
-                self.args = ["Hello", "World"]
-                self.content = "/echo Hello World"
-                self.sender = "test_sender"
-
-            def reply(self, message, **kwargs):
-                self.response = message
-
-        ctx = MockContext()
+        ctx = mock_ctx(
+            sender="test_sender",
+            args=["Hello", "World"],
+            content="/echo Hello World",
+        )
 
         # Execute echo command
         echo_cmd = echo_bot.bot.commands["echo"]
         echo_cmd.callback(ctx)
 
         # Verify response
-        assert hasattr(ctx, "response")
-        assert "Hello World" in ctx.response
-
-        echo_bot.bot.cleanup()
+        assert ctx.responses
+        assert "Hello World" in ctx.responses[-1]
 
-    def test_note_bot_operations(self, test_config_dir):
+    def test_note_bot_operations(self, note_bot, mock_ctx):
         """Test note bot can store and retrieve notes."""
-        from lxmfy.templates import NoteBot
-
-        note_bot = NoteBot(test_mode=True)
-
-        # Mock context for testing
-        class MockContext:
-            def __init__(self, sender="test_user"):
-                self.sender = sender
-                self.args = []
-
-            def reply(self, message):
-                self.responses = getattr(self, "responses", [])
-                self.responses.append(message)
-
         # Test note saving
-        save_ctx = MockContext()
-        save_ctx.args = ["This", "is", "a", "test", "note"]
-        save_ctx.content = "/note This is a test note"
+        save_ctx = mock_ctx(
+            args=["This", "is", "a", "test", "note"],
+            content="/note This is a test note",
+        )
 
         note_cmd = note_bot.bot.commands["note"]
         note_cmd.callback(save_ctx)
@@ -361,34 +288,20 @@ class TestTemplateBotOperations:
         assert "saved" in save_ctx.responses[0].lower()
 
         # Test note listing
-        list_ctx = MockContext()
+        list_ctx = mock_ctx()
         list_cmd = note_bot.bot.commands["notes"]
         list_cmd.callback(list_ctx)
 
         assert len(list_ctx.responses) == 1
         assert "test note" in list_ctx.responses[0]
 
-        note_bot.bot.cleanup()
-
-    def test_reminder_bot_operations(self, test_config_dir):
+    def test_reminder_bot_operations(self, reminder_bot, mock_ctx):
         """Test reminder bot can set and list reminders."""
-        from lxmfy.templates import ReminderBot
-
-        reminder_bot = ReminderBot(test_mode=True)
-
-        class MockContext:
-            def __init__(self, sender="test_user"):
-                self.sender = sender
-                self.args = []
-
-            def reply(self, message):
-                self.responses = getattr(self, "responses", [])
-                self.responses.append(message)
-
         # Test reminder setting
-        remind_ctx = MockContext()
-        remind_ctx.args = ["1h", "Test", "reminder"]
-        remind_ctx.content = "/remind 1h Test reminder"
+        remind_ctx = mock_ctx(
+            args=["1h", "Test", "reminder"],
+            content="/remind 1h Test reminder",
+        )
 
         remind_cmd = reminder_bot.bot.commands["remind"]
         remind_cmd.callback(remind_ctx)
@@ -397,11 +310,9 @@ class TestTemplateBotOperations:
         assert "remind" in remind_ctx.responses[0].lower()
 
         # Test reminder listing
-        list_ctx = MockContext()
+        list_ctx = mock_ctx()
         list_cmd = reminder_bot.bot.commands["list"]
         list_cmd.callback(list_ctx)
 
         assert len(list_ctx.responses) == 1
         assert "reminders" in list_ctx.responses[0].lower()
-
-        reminder_bot.bot.cleanup()
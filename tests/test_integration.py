@@ -1,7 +1,6 @@
 """Integration tests for LXMFy client-bot communication."""
 
-from unittest.mock import Mock
-
+import pytest
 import RNS
 from LXMF import LXMessage
 
@@ -9,9 +8,11 @@ from LXMF import LXMessage
 class TestClientBotCommunication:
     """Test client-bot message exchange."""
 
-    def test_message_sending(self, test_bot, test_destination):
+    def test_message_sending(
+        self, test_bot, test_destination, test_destination_hexhash, monkeypatch
+    ):
         """Test basic message sending functionality."""
-        # Mock the queue.put to capture queued messages
+        # Capture queued messages while still queueing them
         original_queue_put = test_bot.queue.put
         queued_messages = []
 
@@ -19,39 +20,35 @@ class TestClientBotCommunication:
             queued_messages.append(message)
             return original_queue_put(message)
 
-        test_bot.queue.put = capture_queue_put
+        monkeypatch.setattr(test_bot.queue, "put", capture_queue_put)
 
         # Mock Identity.recall to return the test identity so send() works
         original_recall = RNS.Identity.recall
-        RNS.Identity.recall = (
+        monkeypatch.setattr(
+            RNS.Identity,
+            "recall",
             lambda hash_bytes: test_destination.identity
             if hash_bytes == test_destination.hash
-            else original_recall(hash_bytes)
+            else original_recall(hash_bytes),
         )
 
-        try:
-            # Send a message using the test destination's hash
-            dest_hash = RNS.hexrep(test_destination.hash, delimit=False)
-            test_bot.send(dest_hash, "Hello World", "Test Title")
-
-            # Verify message was queued
-            assert len(queued_messages) == 1
-            message = queued_messages[0]
-
-            # In test mode, message is a SimpleNamespace, not LXMessage
-            if test_bot.config.test_mode:
-                assert message.content.decode() == "Hello World"
-                assert message.title.decode() == "Test Title"
-            else:
-                assert isinstance(message, LXMessage)
-                assert message.content.decode() == "Hello World"
-                assert message.title.decode() == "Test Title"
-        finally:
-            # Restore original methods
-            test_bot.queue.put = original_queue_put
-            RNS.Identity.recall = original_recall
-
-    def test_command_processing(self, test_bot):
+        # Send a message using the test destination's hash
+        test_bot.send(test_destination_hexhash, "Hello World", "Test Title")
+
+        # Verify message was queued
+        assert len(queued_messages) == 1
+        message = queued_messages[0]
+
+        # In test mode, message is a SimpleNamespace, not LXMessage
+        if test_bot.config.test_mode:
+            assert message.content.decode() == "Hello World"
+            assert message.title.decode() == "Test Title"
+        else:
+            assert isinstance(message, LXMessage)
+            assert message.content.decode() == "Hello World"
+            assert message.title.decode() == "Test Title"
+
+    def test_command_processing(self, test_bot, make_message, monkeypatch):
         """Test command processing pipeline."""
         # Register a test command
         responses = []
@@ -62,18 +59,15 @@ class TestClientBotCommunication:
             ctx.reply("Command executed")
 
         # Mock the send method to capture responses
-        original_send = test_bot.send
         sent_messages = []
 
         def mock_send(destination, message, title=None, **kwargs):
             sent_messages.append((destination, message, title))
 
-        test_bot.send = mock_send
+        monkeypatch.setattr(test_bot, "send", mock_send)
 
         # Simulate receiving a command message
-        mock_message = Mock()
-        mock_message.content = b"/test argument"
-        mock_message.hash = b"message_hash_123"
+        mock_message = make_message(b"/test argument")
 
         # Process the message
         test_bot._process_message(mock_message, "test_sender_hash")
@@ -87,152 +81,77 @@ class TestClientBotCommunication:
         assert dest == "test_sender_hash"
         assert msg == "Command executed"
 
-        # Restore original send method
-        test_bot.send = original_send
+    def test_command_dispatch_args(self, test_bot, make_message, monkeypatch):
+        """Test dispatch passes split arguments and ignores unknown commands."""
+        calls = []
+
+        @test_bot.command("echo")
+        def echo_cmd(ctx):
+            calls.append(ctx.args)
+
+        monkeypatch.setattr(test_bot, "send", lambda *args, **kwargs: None)
+
+        for content in (b"/echo a b", b"/echo", b"/missing x"):
+            test_bot._process_message(make_message(content), "dispatch_sender")
 
-    def test_spam_protection(self, test_bot):
-        """Test spam protection functionality."""
+        assert calls == [["a", "b"], []]
+
+    def test_spam_protection(self, test_bot, monkeypatch):
+        """Test spam protection allows exactly rate_limit messages per cooldown."""
         sender = "spam_sender_hash"
+        spam = test_bot.spam_protection
 
-        # Initially should allow messages
-        allowed, message = test_bot.spam_protection.check_spam(sender)
-        assert allowed
-        assert message is None
-
-        # Test that spam protection exists and has expected attributes
-        assert hasattr(test_bot, "spam_protection")
-        assert hasattr(test_bot.spam_protection, "check_spam")
-        assert callable(test_bot.spam_protection.check_spam)
-
-        # Test multiple messages - should eventually trigger protection
-        # (exact behavior depends on timing, but method should exist)
-        for i in range(5):  # Just test a few messages
-            result_allowed, result_message = test_bot.spam_protection.check_spam(sender)
-            # Should either allow or deny, but not crash
-            assert isinstance(result_allowed, bool)
-            if result_message:
-                assert isinstance(result_message, str)
-
-    def test_message_validation(self, test_bot):
-        """Test message validation and processing."""
-        # Test with various message formats
-        test_cases = [
-            (b"/help", True, "help command"),
-            (b"regular message", True, "regular message"),
-            (b"", True, "empty message"),
-            (b"/nonexistent", True, "nonexistent command"),
-        ]
-
-        for content, should_process, description in test_cases:
-            mock_message = Mock()
-            mock_message.content = content
-            mock_message.source_hash = b"test_hash"
-
-            # Should not raise exceptions
-            try:
-                test_bot._process_message(mock_message, "test_hash")
-                success = True
-            except Exception as e:
-                success = False
-                print(f"Failed processing {description}: {e}")
-
-            assert success, f"Failed to process {description}"
-
-
-class TestLXMFIntegration:
-    """Test LXMF-specific integration."""
-
-    def test_lxmf_message_creation(self, lxmf_router):
-        """Test LXMF message creation and basic properties."""
-        # Create a test message
-        message = LXMessage(
-            destination=lxmf_router._test_delivery_dest,
-            source=lxmf_router._test_delivery_dest,
-            content=b"Test content",
-            title=b"Test Title",
-        )
+        # Enforce permissions so the sender does not bypass spam checks,
+        # and freeze the clock so no message leaves the cooldown window
+        monkeypatch.setattr(test_bot.permissions, "enabled", True)
+        monkeypatch.setattr(spam.config, "rate_limit", 3)
+        monkeypatch.setattr("lxmfy.moderation.time", lambda: 100.0)
+
+        capacity = spam.config.rate_limit
+        results = [spam.check_spam(sender) for _ in range(capacity + 1)]
 
-        assert message.content == b"Test content"
-        assert message.title == b"Test Title"
-        assert message.source_hash is not None
-        assert message.destination_hash is not None
-
-    def test_router_functionality(self, lxmf_router):
-        """Test LXMF router basic functionality."""
-        assert lxmf_router._test_delivery_dest is not None
-        assert lxmf_router.storagepath is not None
-
-        # Test router can handle outbound messages
-        message = LXMessage(
-            destination=lxmf_router._test_delivery_dest,
-            source=lxmf_router._test_delivery_dest,
-            content=b"Test message",
+        assert results[:capacity] == [(True, None)] * capacity
+        assert results[capacity] == (
+            False,
+            f"Rate limit exceeded. Warning 1/{spam.config.max_warnings}",
         )
 
-        # Should not raise exceptions
-        lxmf_router.handle_outbound(message)
+    @pytest.mark.parametrize(
+        "content",
+        [b"/help", b"regular message", b"", b"/nonexistent"],
+        ids=["help_command", "regular_message", "empty_message", "unknown_command"],
+    )
+    def test_message_validation(self, test_bot, make_message, content):
+        """Test processing a message of each kind does not raise."""
+        test_bot._process_message(make_message(content), "test_hash")
 
 
+@pytest.mark.usefixtures("template_workdir")
 class TestTemplateBots:
     """Test the built-in template bots."""
 
-    def test_echo_bot_creation(self, test_config_dir):
-        """Test creating an echo bot template."""
-        from lxmfy.templates import EchoBot
-
-        # Create echo bot instance
-        echo_bot = EchoBot(test_mode=True)
-
-        assert echo_bot.bot is not None
-        assert echo_bot.bot.config.name == "Echo Bot"
-        assert "echo" in echo_bot.bot.commands
-
-        # Test echo command exists
+    @pytest.mark.parametrize(
+        "template,name,commands",
+        [
+            ("echo_bot", "Echo Bot", {"echo"}),
+            ("note_bot", "Note Bot", {"note", "notes"}),
+            ("reminder_bot", "Reminder Bot", {"remind", "list"}),
+            ("cogtest_bot", "CogTestBot", {"cogtest", "status"}),
+        ],
+    )
+    def test_template_bot_creation(self, request, template, name, commands):
+        """Test each template builds a bot with its name and commands."""
+        bot = request.getfixturevalue(template).bot
+
+        assert bot.config.name == name
+        assert commands <= bot.commands.keys()
+
+    def test_echo_command(self, echo_bot):
+        """Test the echo template's command metadata."""
         echo_cmd = echo_bot.bot.commands["echo"]
         assert echo_cmd.name == "echo"
         assert "Echo back your message" in echo_cmd.description
 
-        echo_bot.bot.cleanup()
-
-    def test_note_bot_creation(self, test_config_dir):
-        """Test creating a note bot template."""
-        from lxmfy.templates import NoteBot
-
-        note_bot = NoteBot(test_mode=True)
-
-        assert note_bot.bot is not None
-        assert note_bot.bot.config.name == "Note Bot"
-        assert "note" in note_bot.bot.commands
-        assert "notes" in note_bot.bot.commands
-
-        note_bot.bot.cleanup()
-
-    def test_reminder_bot_creation(self, test_config_dir):
-        """Test creating a reminder bot template."""
-        from lxmfy.templates import ReminderBot
-
-        reminder_bot = ReminderBot(test_mode=True)
-
-        assert reminder_bot.bot is not None
-        assert reminder_bot.bot.config.name == "Reminder Bot"
-        assert "remind" in reminder_bot.bot.commands
-        assert "list" in reminder_bot.bot.commands
-
-        reminder_bot.bot.cleanup()
-
-    def test_cog_test_bot_creation(self, test_config_dir):
-        """Test creating a cog test bot template."""
-        from lxmfy.templates import CogTestBot
-
-        cog_bot = CogTestBot(test_mode=True)
-
-        assert cog_bot.bot is not None
-        assert cog_bot.bot.config.name == "CogTestBot"
-        assert "cogtest" in cog_bot.bot.commands
-        assert "status" in cog_bot.bot.commands
-
-        cog_bot.bot.cleanup()
-
 
 class TestMiddlewareSystem:
     """Test middleware system integration."""
@@ -274,11 +193,11 @@ class TestMiddlewareSystem:
 class TestSchedulerSystem:
     """Test task scheduler integration."""
 
-    def test_scheduler_creation(self, test_bot):
+    def test_scheduler_creation(self, shared_bot):
         """Test scheduler is created and functional."""
-        assert test_bot.scheduler is not None
-        assert hasattr(test_bot.scheduler, "tasks")
-        assert hasattr(test_bot.scheduler, "add_task")
+        assert shared_bot.scheduler is not None
+        assert hasattr(shared_bot.scheduler, "tasks")
+        assert hasattr(shared_bot.scheduler, "add_task")
 
     def test_task_scheduling(self, test_bot):
         """Test task scheduling functionality."""
@@ -1,17 +1,81 @@
 """Tests for LXMFy signature functionality."""
 
-from unittest.mock import MagicMock, patch
+import hashlib
+import struct
+import sys
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import LXMF
 import pytest
 import RNS
 
+from lxmfy.permissions import DefaultPerms, PermissionManager
 from lxmfy.signatures import (
+    DIGEST_SIZE,
     FIELD_SIGNATURE,
+    IDENTITY_RECALL_TTL,
+    NEGATIVE_RECALL_TTL,
+    SIGNATURE_LENGTH,
     SignatureManager,
     sign_outgoing_message,
     verify_incoming_message,
 )
+from lxmfy.storage import SQLiteStorage
+
+
+class _StubBot:
+    """Plain bot stand-in with no permissions system attached."""
+
+
+def _raise_test_error(*args, **kwargs):
+    raise Exception("Test error")
+
+
+def _record(tag, value):
+    """Build one tag/length/value record of the canonical signing layout."""
+    return bytes([tag]) + len(value).to_bytes(4, "little") + value
+
+
+def _digest(*records):
+    """Hash records the way the canonical signing digest does."""
+    return hashlib.blake2b(
+        b"".join(records), digest_size=64, person=b"lxmfy-sig-v2"
+    ).digest()
+
+
+def _make_msg(**overrides):
+    """Build a plain message stand-in with the fields the signer reads."""
+    attrs = {
+        "source_hash": b"source_hash",
+        "destination_hash": b"dest_hash",
+        "content": b"test content",
+        "title": b"test title",
+        "timestamp": None,
+        "fields": {},
+    }
+    attrs.update(overrides)
+    return SimpleNamespace(**attrs)
+
+
+def _make_bot(**attrs):
+    """Build a plain bot stand-in carrying only the given attributes."""
+    return SimpleNamespace(**attrs)
+
+
+def _make_sig_manager(should_verify=True, **attrs):
+    """Build a signature manager stand-in for ``verify_incoming_message``."""
+    return SimpleNamespace(should_verify_message=lambda sender: should_verify, **attrs)
+
+
+def _batch_message(identity, index):
+    """Build a distinct message from identity for batch verification tests."""
+    return _make_msg(
+        source_hash=identity.hash,
+        content=f"message {index}".encode(),
+        title=b"batch",
+    )
 
 
 class TestSignatureManager:
@@ -19,7 +83,7 @@ class TestSignatureManager:
 
     def test_init(self):
         """Test SignatureManager initialization."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(
             bot,
             verification_enabled=True,
@@ -32,127 +96,121 @@ class TestSignatureManager:
 
     def test_init_defaults(self):
         """Test SignatureManager initialization with defaults."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
 
         assert sig_manager.verification_enabled is False
         assert sig_manager.require_signatures is False
 
-    def test_sign_message_success(self):
-        """Test successful message signing."""
-        bot = MagicMock()
+    def test_sign_message_success(self, cached_identity):
+        """Test the identity signs the v2 digest of the message."""
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
-        identity = RNS.Identity()
-
-        # Create a proper mock message
-        mock_message = MagicMock()
-        mock_message.source_hash = b"source_hash"
-        mock_message.destination_hash = b"dest_hash"
-        mock_message.content = b"test content"
-        mock_message.title = b"test title"
-        mock_message.fields = {}
-
-        # Mock the canonicalize method to return predictable data
-        expected_data = (
-            b"source:source_hash|dest:dest_hash|content:test content|title:test title"
-        )
-        with patch.object(
-            sig_manager,
-            "_canonicalize_message",
-            return_value=expected_data,
-        ):
-            result = sig_manager.sign_message(mock_message, identity)
 
-            assert isinstance(result, bytes)
-            assert len(result) > 0  # Should have a signature
+        mock_message = _make_msg()
+        identity = MagicMock(wraps=cached_identity)
+
+        result = sig_manager.sign_message(mock_message, identity)
 
-    def test_sign_message_exception(self):
+        expected_digest = _digest(
+            _record(1, b"source_hash"),
+            _record(2, b"dest_hash"),
+            _record(3, b"test content"),
+            _record(4, b"test title"),
+        )
+        identity.sign.assert_called_once_with(expected_digest)
+        assert cached_identity.validate(result, expected_digest)
+
+    def test_sign_message_exception(self, cached_identity, monkeypatch):
         """Test sign_message with exception."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
-        identity = RNS.Identity()
-        mock_message = MagicMock()
+        mock_message = _make_msg()
 
         # Mock the _canonicalize_message to raise an exception
-        with (
-            patch.object(
-                sig_manager,
-                "_canonicalize_message",
-                side_effect=Exception("Test error"),
-            ),
-            pytest.raises(Exception, match="Test error"),
-        ):
-            sig_manager.sign_message(mock_message, identity)
-
-    def test_verify_message_signature_success(self):
+        monkeypatch.setattr(sig_manager, "_canonicalize_message", _raise_test_error)
+        with pytest.raises(Exception, match="Test error"):
+            sig_manager.sign_message(mock_message, cached_identity)
+
+    def test_verify_message_signature_success(self, cached_identity):
         """Test successful signature verification."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
-        identity = RNS.Identity()
 
         # Create a message and sign it
-        mock_message = MagicMock()
-        mock_message.source_hash = b"source_hash"
-        mock_message.destination_hash = b"dest_hash"
-        mock_message.content = b"test content"
-        mock_message.title = b"test title"
-        mock_message.fields = {}
+        mock_message = _make_msg()
 
         # Sign the message
-        signature = sig_manager.sign_message(mock_message, identity)
+        signature = sig_manager.sign_message(mock_message, cached_identity)
         mock_message.fields[FIELD_SIGNATURE] = signature
 
         # Verify the signature
-        sender_hash = RNS.hexrep(identity.hash, delimit=False)
+        sender_hash = cached_identity.hash.hex()
         result = sig_manager.verify_message_signature(
             mock_message,
             signature,
             sender_hash,
-            identity,
+            cached_identity,
         )
 
         assert result is True
 
-    def test_verify_message_signature_invalid(self):
+    @pytest.mark.parametrize(
+        "fake_signature",
+        [
+            b"fake_signature",
+            b"",
+            bytes(SIGNATURE_LENGTH - 1),
+            bytes(SIGNATURE_LENGTH),
+        ],
+        ids=["short", "empty", "one_byte_short", "wrong_key"],
+    )
+    def test_verify_message_signature_invalid(self, cached_identity, fake_signature):
         """Test signature verification with invalid signature."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
-        identity = RNS.Identity()
 
-        mock_message = MagicMock()
-        mock_message.source_hash = b"source_hash"
-        mock_message.destination_hash = b"dest_hash"
-        mock_message.content = b"test content"
-        mock_message.title = b"test title"
-        mock_message.fields = {}
+        mock_message = _make_msg()
 
-        # Use a fake signature
-        fake_signature = b"fake_signature"
-
-        sender_hash = RNS.hexrep(identity.hash, delimit=False)
+        sender_hash = cached_identity.hash.hex()
         result = sig_manager.verify_message_signature(
             mock_message,
             fake_signature,
             sender_hash,
-            identity,
+            cached_identity,
         )
 
         assert result is False
 
+    @pytest.mark.parametrize(
+        "signature",
+        [b"", bytes(SIGNATURE_LENGTH - 1), bytes(SIGNATURE_LENGTH + 1), "x" * 64],
+        ids=["empty", "short", "long", "str"],
+    )
+    def test_malformed_signature_skips_validation(self, signature):
+        """Test a signature of the wrong shape is rejected without any crypto."""
+        sig_manager = SignatureManager(_StubBot())
+        identity = MagicMock()
+        message = _make_msg()
+
+        assert not sig_manager.verify_message_signature(
+            message, signature, "sender_hash", identity
+        )
+        assert sig_manager.verify_batch([(message, signature, "sender_hash")]) == [
+            False
+        ]
+        identity.validate.assert_not_called()
+
     def test_verify_message_signature_no_identity_recall(self):
         """Test signature verification when identity recall fails."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
 
-        mock_message = MagicMock()
-        mock_message.source_hash = b"source_hash"
-        mock_message.destination_hash = b"dest_hash"
-        mock_message.content = b"test content"
-        mock_message.title = b"test title"
+        mock_message = _make_msg()
 
         # Use a non-existent hash
         fake_hash = "nonexistent"
-        fake_signature = b"fake_signature"
+        fake_signature = bytes(SIGNATURE_LENGTH)
 
         result = sig_manager.verify_message_signature(
             mock_message,
@@ -162,76 +220,251 @@ class TestSignatureManager:
 
         assert result is False
 
-    def test_verify_message_signature_exception(self):
+    def test_identity_recall_is_cached(self, shared_identity, monkeypatch):
+        """Test recalls are reused and retried once their TTL has passed."""
+        identity, _ = shared_identity
+        sig_manager = SignatureManager(_StubBot())
+        unknown_hash = bytes(16)
+        clock = [100.0]
+        recalls = []
+
+        def recall(hash_bytes):
+            recalls.append(hash_bytes)
+            return identity if hash_bytes == identity.hash else None
+
+        monkeypatch.setattr(RNS.Identity, "recall", recall)
+        monkeypatch.setattr("lxmfy.signatures.monotonic", lambda: clock[0])
+        message = _batch_message(identity, 0)
+        signature = sig_manager.sign_message(message, identity)
+
+        for _ in range(3):
+            assert sig_manager.verify_message_signature(
+                message, signature, identity.hash.hex()
+            )
+            assert not sig_manager.verify_message_signature(
+                message, signature, unknown_hash.hex()
+            )
+        assert recalls == [identity.hash, unknown_hash]
+
+        # A failed recall is retried once its TTL has passed
+        clock[0] += NEGATIVE_RECALL_TTL
+        assert not sig_manager.verify_message_signature(
+            message, signature, unknown_hash.hex()
+        )
+        assert recalls == [identity.hash, unknown_hash, unknown_hash]
+
+        # So is a successful one, picking up a newer announce
+        clock[0] += IDENTITY_RECALL_TTL
+        assert sig_manager.verify_message_signature(
+            message, signature, identity.hash.hex()
+        )
+        assert recalls[-1] == identity.hash
+        assert len(recalls) == 4
+
+        sig_manager.clear_identity_cache()
+        assert sig_manager.verify_message_signature(
+            message, signature, identity.hash.hex()
+        )
+        assert recalls[-1] == identity.hash
+        assert len(recalls) == 5
+
+    def test_identity_cache_evicts_least_recently_used(self, monkeypatch):
+        """Test the identity cache drops its least recently used entry when full."""
+        sig_manager = SignatureManager(_StubBot())
+        monkeypatch.setattr("lxmfy.signatures.IDENTITY_CACHE_SIZE", 2)
+        monkeypatch.setattr(RNS.Identity, "recall", lambda hash_bytes: None)
+
+        for sender_hash in ("00", "01", "00", "02"):
+            sig_manager._recall_identity(sender_hash)
+
+        assert list(sig_manager._identities) == ["00", "02"]
+
+    def test_identity_cache_is_thread_safe(self, monkeypatch):
+        """Test threads recalling at once keep the cache within its bound."""
+        sig_manager = SignatureManager(_StubBot())
+        monkeypatch.setattr("lxmfy.signatures.IDENTITY_CACHE_SIZE", 8)
+        monkeypatch.setattr(RNS.Identity, "recall", lambda hash_bytes: None)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        errors = []
+
+        def recall_many(worker):
+            try:
+                for i in range(20000):
+                    sig_manager._recall_identity(f"{worker:02x}{i:04x}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=recall_many, args=(n,)) for n in range(4)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert errors == []
+        assert len(sig_manager._identities) == 8
+
+    def test_verify_message_signature_exception(self, monkeypatch):
         """Test signature verification with exception."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
 
-        mock_message = MagicMock()
-        mock_message.source_hash = b"source_hash"
+        mock_message = _make_msg()
 
         # Mock _canonicalize_message to raise exception
-        with patch.object(
-            sig_manager,
-            "_canonicalize_message",
-            side_effect=Exception("Test error"),
-        ):
-            result = sig_manager.verify_message_signature(
-                mock_message,
-                b"signature",
-                "fake_hash",
+        monkeypatch.setattr(sig_manager, "_canonicalize_message", _raise_test_error)
+        result = sig_manager.verify_message_signature(
+            mock_message,
+            bytes(SIGNATURE_LENGTH),
+            "fake_hash",
+        )
+        assert result is False
+
+    def test_batch_verification_matches_sequential(self, shared_identity):
+        """Test verify_batch agrees with one-by-one verification."""
+        identity, _ = shared_identity
+        sig_manager = SignatureManager(_StubBot())
+        sender_hash = identity.hash.hex()
+
+        items = []
+        for i in range(32):
+            message = _batch_message(identity, i)
+            items.append(
+                (message, sig_manager.sign_message(message, identity), sender_hash)
+            )
+        # Flip one bit in one signature
+        message, signature, _ = items[7]
+        items[7] = (message, bytes([signature[0] ^ 1]) + signature[1:], sender_hash)
+
+        sequential = [
+            sig_manager.verify_message_signature(m, sig, h, identity)
+            for m, sig, h in items
+        ]
+        results = sig_manager.verify_batch((m, sig, h, identity) for m, sig, h in items)
+
+        assert results == sequential
+        assert [i for i, ok in enumerate(results) if not ok] == [7]
+
+    def test_batch_verification_recalls_each_sender_once(
+        self, shared_identity, monkeypatch
+    ):
+        """Test verify_batch looks up a repeated sender only once."""
+        identity, _ = shared_identity
+        sig_manager = SignatureManager(_StubBot())
+        sender_hash = identity.hash.hex()
+        recalls = []
+
+        def recall(hash_bytes):
+            recalls.append(hash_bytes)
+            return identity
+
+        monkeypatch.setattr(RNS.Identity, "recall", recall)
+        items = []
+        for i in range(4):
+            message = _batch_message(identity, i)
+            items.append(
+                (message, sig_manager.sign_message(message, identity), sender_hash)
             )
-            assert result is False
+        items.append((_batch_message(identity, 4), b"fake_signature", "nonexistent"))
+
+        assert sig_manager.verify_batch(items) == [True, True, True, True, False]
+        assert recalls == [identity.hash]
 
     def test_canonicalize_message_basic(self):
         """Test basic message canonicalization."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
 
-        mock_message = MagicMock()
-        mock_message.source_hash = b"source_hash"
-        mock_message.destination_hash = b"dest_hash"
-        mock_message.content = b"test content"
-        mock_message.title = b"test title"
-        mock_message.timestamp = 1234567890
-        mock_message.fields = {1: b"field1", FIELD_SIGNATURE: b"signature"}
+        mock_message = _make_msg(
+            timestamp=1234567890,
+            fields={1: b"field1", FIELD_SIGNATURE: b"signature"},
+        )
 
         result = sig_manager._canonicalize_message(mock_message)
 
-        expected_parts = [
-            b"source:736f757263655f68617368",  # hex of b"source_hash"
-            b"dest:646573745f68617368",  # hex of b"dest_hash"
-            b"content:test content",
-            b"title:test title",
-            b"timestamp:1234567890",
-            b"field_1:b'field1'",
-        ]
-        expected = b"|".join(expected_parts)
+        expected = _digest(
+            _record(1, b"source_hash"),
+            _record(2, b"dest_hash"),
+            _record(3, b"test content"),
+            _record(4, b"test title"),
+            _record(5, struct.pack("<d", 1234567890)),
+            _record(6, b"\x92\x01\xc4\x06field1"),  # msgpack [1, b"field1"]
+        )
 
+        assert len(result) == DIGEST_SIZE == 64
         assert result == expected
 
+    def test_canonicalize_message_swapped_hashes(self):
+        """Test swapping source and destination changes the digest."""
+        sig_manager = SignatureManager(_StubBot())
+        message = _make_msg()
+        swapped = _make_msg(source_hash=b"dest_hash", destination_hash=b"source_hash")
+
+        assert sig_manager._canonicalize_message(
+            message
+        ) != sig_manager._canonicalize_message(swapped)
+
+    def test_canonicalize_message_field_order(self):
+        """Test field insertion order does not change the canonical form."""
+        sig_manager = SignatureManager(_StubBot())
+        base = {
+            "source_hash": b"source_hash",
+            "destination_hash": b"dest_hash",
+            "content": b"content",
+            "title": None,
+            "timestamp": None,
+        }
+        forward = SimpleNamespace(
+            fields={1: b"a", 2: [b"b"], FIELD_SIGNATURE: b"sig"}, **base
+        )
+        backward = SimpleNamespace(
+            fields={FIELD_SIGNATURE: b"other", 2: [b"b"], 1: b"a"}, **base
+        )
+
+        assert sig_manager._canonicalize_message(
+            forward
+        ) == sig_manager._canonicalize_message(backward)
+
+    def test_canonicalize_message_is_unambiguous(self):
+        """Test moving bytes between elements changes the canonical form."""
+        sig_manager = SignatureManager(_StubBot())
+        base = {
+            "source_hash": b"source_hash",
+            "destination_hash": b"dest_hash",
+            "timestamp": None,
+            "fields": {},
+        }
+        joined = SimpleNamespace(content=b"hi|title:x", title=None, **base)
+        split = SimpleNamespace(content=b"hi", title=b"x", **base)
+
+        assert sig_manager._canonicalize_message(
+            joined
+        ) != sig_manager._canonicalize_message(split)
+
     def test_canonicalize_message_minimal(self):
         """Test message canonicalization with minimal fields."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
 
-        mock_message = MagicMock()
-        mock_message.source_hash = None
-        mock_message.destination_hash = None
-        mock_message.content = None
-        mock_message.title = None
-        mock_message.timestamp = None
-        mock_message.fields = None
+        mock_message = _make_msg(
+            source_hash=None,
+            destination_hash=None,
+            content=None,
+            title=None,
+            fields=None,
+        )
 
         result = sig_manager._canonicalize_message(mock_message)
 
-        assert result == b""
+        assert result == _digest()
 
     def test_should_verify_message_enabled(self):
         """Test should_verify_message when verification is enabled."""
-        bot = MagicMock()
-        # Remove permissions attribute to simulate no permissions system
-        del bot.permissions
+        # The stub has no permissions attribute, like a bot without a permissions system
+        bot = _StubBot()
         sig_manager = SignatureManager(bot, verification_enabled=True)
 
         result = sig_manager.should_verify_message("sender_hash")
@@ -239,17 +472,24 @@ class TestSignatureManager:
 
     def test_should_verify_message_disabled(self):
         """Test should_verify_message when verification is disabled."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot, verification_enabled=False)
 
         result = sig_manager.should_verify_message("sender_hash")
         assert result is False
 
+    def test_should_verify_message_disabled_skips_permissions(self):
+        """Test disabled verification returns before consulting permissions."""
+        bot = _make_bot(permissions=MagicMock(enabled=True))
+
+        sig_manager = SignatureManager(bot, verification_enabled=False)
+
+        assert sig_manager.should_verify_message("sender_hash") is False
+        bot.permissions.has_permission.assert_not_called()
+
     def test_should_verify_message_bypass_permission(self):
         """Test should_verify_message with bypass permission."""
-        bot = MagicMock()
-        bot.permissions = MagicMock()
-        bot.permissions.enabled = True
+        bot = _make_bot(permissions=MagicMock(enabled=True))
         bot.permissions.has_permission.return_value = True
 
         sig_manager = SignatureManager(bot, verification_enabled=True)
@@ -258,12 +498,45 @@ class TestSignatureManager:
         assert result is False
         bot.permissions.has_permission.assert_called_once()
 
+    def test_should_verify_message_follows_role_changes(self):
+        """Test bypass decisions follow role changes at once."""
+        permissions = PermissionManager(storage=SQLiteStorage(":memory:"), enabled=True)
+        permissions.create_role("trusted", DefaultPerms.BYPASS_SPAM)
+        sig_manager = SignatureManager(
+            _make_bot(permissions=permissions), verification_enabled=True
+        )
+
+        assert sig_manager.should_verify_message("sender_hash") is True
+        permissions.assign_role("sender_hash", "trusted")
+        assert sig_manager.should_verify_message("sender_hash") is False
+        permissions.remove_role("sender_hash", "trusted")
+        assert sig_manager.should_verify_message("sender_hash") is True
+
+        permissions.assign_role("sender_hash", "trusted")
+        assert sig_manager.should_verify_message("sender_hash") is False
+        permissions.delete_role("trusted")
+        assert sig_manager.should_verify_message("sender_hash") is True
+
+    def test_should_verify_message_follows_direct_role_edits(self):
+        """Test editing the role tables directly takes effect at once."""
+        permissions = PermissionManager(storage=SQLiteStorage(":memory:"), enabled=True)
+        permissions.create_role("trusted", DefaultPerms.BYPASS_SPAM)
+        permissions.assign_role("sender_hash", "trusted")
+        sig_manager = SignatureManager(
+            _make_bot(permissions=permissions), verification_enabled=True
+        )
+
+        assert sig_manager.should_verify_message("sender_hash") is False
+        permissions.user_roles["sender_hash"] = {"user"}
+        assert sig_manager.should_verify_message("sender_hash") is True
+
     def test_should_verify_message_no_bypass(self):
         """Test should_verify_message without bypass permission."""
-        bot = MagicMock()
-        bot.permissions = MagicMock()
-        bot.permissions.enabled = True
-        bot.permissions.has_permission.return_value = False
+        bot = _make_bot(
+            permissions=SimpleNamespace(
+                enabled=True, has_permission=lambda sender, perm: False
+            )
+        )
 
         sig_manager = SignatureManager(bot, verification_enabled=True)
 
@@ -272,7 +545,7 @@ class TestSignatureManager:
 
     def test_handle_unsigned_message_require_signatures(self):
         """Test handle_unsigned_message when signatures are required."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot, require_signatures=True)
 
         result = sig_manager.handle_unsigned_message("sender_hash", "message_hash")
@@ -280,7 +553,7 @@ class TestSignatureManager:
 
     def test_handle_unsigned_message_verification_enabled(self):
         """Test handle_unsigned_message when verification is enabled but not required."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(
             bot,
             verification_enabled=True,
@@ -292,7 +565,7 @@ class TestSignatureManager:
 
     def test_handle_unsigned_message_disabled(self):
         """Test handle_unsigned_message when verification is disabled."""
-        bot = MagicMock()
+        bot = _StubBot()
         sig_manager = SignatureManager(bot)
 
         result = sig_manager.handle_unsigned_message("sender_hash", "message_hash")
@@ -302,15 +575,14 @@ class TestSignatureManager:
 class TestSignatureFunctions:
     """Test signature utility functions."""
 
-    def test_sign_outgoing_message_passthrough(self):
+    def test_sign_outgoing_message_passthrough(self, cached_identity):
         """Test sign_outgoing_message is a pass-through (LXMF handles signing)."""
-        bot = MagicMock()
-        bot.signature_manager = MagicMock()
-        bot.signature_manager.verification_enabled = True
-        bot.identity = RNS.Identity()
+        bot = _make_bot(
+            signature_manager=_make_sig_manager(verification_enabled=True),
+            identity=cached_identity,
+        )
 
-        mock_message = MagicMock()
-        mock_message.fields = {}
+        mock_message = _make_msg()
 
         result = sign_outgoing_message(bot, mock_message)
 
@@ -319,13 +591,9 @@ class TestSignatureFunctions:
 
     def test_verify_incoming_message_valid_signature(self):
         """Test verify_incoming_message with valid LXMF signature."""
-        bot = MagicMock()
-        bot.signature_manager = MagicMock()
-        bot.signature_manager.should_verify_message.return_value = True
+        bot = _make_bot(signature_manager=_make_sig_manager())
 
-        mock_message = MagicMock()
-        mock_message.signature_validated = True
-        mock_message.hash = b"message_hash"
+        mock_message = _make_msg(signature_validated=True, hash=b"message_hash")
 
         result = verify_incoming_message(bot, mock_message, "sender_hash")
 
@@ -333,11 +601,9 @@ class TestSignatureFunctions:
 
     def test_verify_incoming_message_skip_verification(self):
         """Test verify_incoming_message when verification should be skipped."""
-        bot = MagicMock()
-        bot.signature_manager = MagicMock()
-        bot.signature_manager.should_verify_message.return_value = False
+        bot = _make_bot(signature_manager=_make_sig_manager(should_verify=False))
 
-        mock_message = MagicMock()
+        mock_message = _make_msg()
 
         result = verify_incoming_message(bot, mock_message, "sender_hash")
 
@@ -345,14 +611,13 @@ class TestSignatureFunctions:
 
     def test_verify_incoming_message_invalid_signature(self):
         """Test verify_incoming_message when LXMF signature is invalid."""
-        bot = MagicMock()
-        bot.signature_manager = MagicMock()
-        bot.signature_manager.should_verify_message.return_value = True
+        bot = _make_bot(signature_manager=_make_sig_manager())
 
-        mock_message = MagicMock()
-        mock_message.signature_validated = False
-        mock_message.unverified_reason = LXMF.LXMessage.SIGNATURE_INVALID
-        mock_message.hash = b"message_hash"
+        mock_message = _make_msg(
+            signature_validated=False,
+            unverified_reason=LXMF.LXMessage.SIGNATURE_INVALID,
+            hash=b"message_hash",
+        )
 
         result = verify_incoming_message(bot, mock_message, "sender_hash")
 
@@ -360,15 +625,13 @@ class TestSignatureFunctions:
 
     def test_verify_incoming_message_source_unknown_require_sig(self):
         """Test verify_incoming_message when source is unknown and signatures required."""
-        bot = MagicMock()
-        bot.signature_manager = MagicMock()
-        bot.signature_manager.should_verify_message.return_value = True
-        bot.signature_manager.require_signatures = True
+        bot = _make_bot(signature_manager=_make_sig_manager(require_signatures=True))
 
-        mock_message = MagicMock()
-        mock_message.signature_validated = False
-        mock_message.unverified_reason = LXMF.LXMessage.SOURCE_UNKNOWN
-        mock_message.hash = b"message_hash"
+        mock_message = _make_msg(
+            signature_validated=False,
+            unverified_reason=LXMF.LXMessage.SOURCE_UNKNOWN,
+            hash=b"message_hash",
+        )
 
         result = verify_incoming_message(bot, mock_message, "sender_hash")
 
@@ -376,15 +639,13 @@ class TestSignatureFunctions:
 
     def test_verify_incoming_message_source_unknown_not_required(self):
         """Test verify_incoming_message when source is unknown but signatures not required."""
-        bot = MagicMock()
-        bot.signature_manager = MagicMock()
-        bot.signature_manager.should_verify_message.return_value = True
-        bot.signature_manager.require_signatures = False
+        bot = _make_bot(signature_manager=_make_sig_manager(require_signatures=False))
 
-        mock_message = MagicMock()
-        mock_message.signature_validated = False
-        mock_message.unverified_reason = LXMF.LXMessage.SOURCE_UNKNOWN
-        mock_message.hash = b"message_hash"
+        mock_message = _make_msg(
+            signature_validated=False,
+            unverified_reason=LXMF.LXMessage.SOURCE_UNKNOWN,
+            hash=b"message_hash",
+        )
 
         result = verify_incoming_message(bot, mock_message, "sender_hash")
 
@@ -392,15 +653,15 @@ class TestSignatureFunctions:
 
     def test_verify_incoming_message_unverified_other_reason(self):
         """Test verify_incoming_message with other unverified reason."""
-        bot = MagicMock()
-        bot.signature_manager = MagicMock()
+        bot = _make_bot(signature_manager=MagicMock())
         bot.signature_manager.should_verify_message.return_value = True
         bot.signature_manager.handle_unsigned_message.return_value = True
 
-        mock_message = MagicMock()
-        mock_message.signature_validated = False
-        mock_message.unverified_reason = 999  # Some other reason
-        mock_message.hash = b"message_hash"
+        mock_message = _make_msg(
+            signature_validated=False,
+            unverified_reason=999,  # Some other reason
+            hash=b"message_hash",
+        )
 
         result = verify_incoming_message(bot, mock_message, "sender_hash")
 
@@ -409,11 +670,10 @@ class TestSignatureFunctions:
 
     def test_verify_incoming_message_no_manager(self):
         """Test verify_incoming_message when no signature manager exists."""
-        bot = MagicMock()
-        # Remove signature_manager attribute to simulate it not existing
-        del bot.signature_manager
+        # The stub has no signature_manager attribute
+        bot = _make_bot()
 
-        mock_message = MagicMock()
+        mock_message = _make_msg()
 
         result = verify_incoming_message(bot, mock_message, "sender_hash")
 
@@ -0,0 +1,47 @@
+"""Benchmarks for LXMFy storage serialization.
+
+Run with ``pytest tests/test_storage_bench.py --benchmark-only
+--benchmark-group-by=func,param:size``.
+"""
+
+import pytest
+
+from lxmfy.storage import deserialize_value, serialize_value
+
+SIZES = [10, 100, 1000]
+
+
+def _nested_payload(size):
+    """Build a payload of ``size`` entries mixing bytes, lists and dicts."""
+    return {
+        f"key_{i}": {
+            "blob": bytes([i % 256]) * 16,
+            "items": [i, str(i), {"flag": True}],
+        }
+        for i in range(size)
+    }
+
+
+class TestSerializationBenchmarks:
+    """Benchmark serialize_value/deserialize_value on nested payloads."""
+
+    @pytest.mark.parametrize("size", SIZES)
+    def test_serialize_bench(self, benchmark, size):
+        """Benchmark serializing a nested payload."""
+        benchmark.group = "serialize"
+        payload = _nested_payload(size)
+
+        result = benchmark(serialize_value, payload)
+
+        assert len(result) == size
+
+    @pytest.mark.parametrize("size", SIZES)
+    def test_deserialize_bench(self, benchmark, size):
+        """Benchmark deserializing a nested payload."""
+        benchmark.group = "deserialize"
+        payload = _nested_payload(size)
+        serialized = serialize_value(payload)
+
+        result = benchmark(deserialize_value, serialized)
+
+        assert result == payload